@@ -0,0 +1,109 @@
+'''
+Run many path and neighbourhood queries against one netlist without the GUI.
+
+Queries come from a CSV file with a header row or from a JSONL file, one per
+line, with the fields: source, target, depth, num_path, blacklist_nets and
+blacklist_components. Only source is required; blacklists are lists in JSONL
+and ';'-separated strings in CSV. Results are written as JSONL in query order.
+'''
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import loader
+import graph
+
+# Set in the parent before the pool starts, so forked workers share it read-only
+_graph = None
+
+
+def load_graph(file_path):
+    return loader.load_file(file_path, with_graph=True)[3]
+
+
+def _init_worker(file_path):
+    global _graph
+    if _graph is None:
+        # Spawned workers (Windows, macOS) reload it, from the parse cache
+        _graph = load_graph(file_path)
+
+
+def _split_list(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(';') if item.strip()]
+    return list(value)
+
+
+def normalize_query(query):
+    return {
+        'source': query['source'],
+        'target': query.get('target') or None,
+        'depth': int(query.get('depth') or 0),
+        'num_path': int(query.get('num_path') or 1),
+        'blacklist_nets': _split_list(query.get('blacklist_nets')),
+        'blacklist_components': _split_list(query.get('blacklist_components')),
+    }
+
+
+def read_queries(file_path):
+    with open(file_path, 'r', encoding='utf-8', newline='') as file:
+        if file_path.lower().endswith('.csv'):
+            for row in csv.DictReader(file):
+                yield normalize_query(row)
+        else:
+            for line in file:
+                if line.strip():
+                    yield normalize_query(json.loads(line))
+
+
+def run_query(query):
+    result = dict(query)
+    try:
+        paths, nodes_found = graph.run_query(
+            _graph, query['source'], query['target'], max(query['depth'], 0),
+            query['blacklist_nets'], query['blacklist_components'], query['num_path'], verbose=False)
+        result['paths'] = paths
+        result['nodes'] = sorted(nodes_found)
+    except Exception as error:
+        result['error'] = f"{type(error).__name__}: {error}"
+    return result
+
+
+def run_batch(file_path, queries, workers=None, chunksize=32):
+    """Yield one result dict per query, in order, using a pool of workers."""
+    global _graph
+    _graph = load_graph(file_path)
+
+    if workers == 1:
+        yield from map(run_query, queries)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(file_path,)) as pool:
+        yield from pool.map(run_query, queries, chunksize=chunksize)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run netlist graph queries in batch")
+    parser.add_argument("file_path", type=str, help="Path to the netlist file")
+    parser.add_argument("queries", type=str, help="Query file (.csv or .jsonl)")
+    parser.add_argument("-o", "--output", type=str, default=None, help="Result file (JSONL), stdout by default")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument("--chunksize", type=int, default=32, help="Queries sent to a worker at a time")
+    args = parser.parse_args()
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for result in run_batch(args.file_path, read_queries(args.queries), args.workers, args.chunksize):
+            output.write(json.dumps(result) + '\n')
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+'''
+Benchmark each stage of a query on synthetic netlists of growing size.
+
+Results are written as JSON so two runs can be compared:
+
+    python benchmark.py --pins 1000 10000 100000 -o before.json
+    python benchmark.py --pins 1000 10000 100000 -o after.json --compare before.json
+
+--startup also times how long netlist.py takes to show its first window, and
+--frozen does the same for a PyInstaller build (see build_spec_example.py).
+Pass --pins with no sizes to time only startup.
+'''
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import loader
+import graph
+import synth_netlist
+
+# pyvis output gets quadratic; skip it above this many rendered nodes
+PYVIS_MAX_NODES = 2000
+
+
+def timed(function, *args, repeat=1, **kwargs):
+    """Return (best wall time in seconds, result of the last call)."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = function(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def bench_netlist(file_path, queries=20, depth=2, num_path=5, repeat=3, seed=0):
+    stages = {}
+    rng = random.Random(seed)
+
+    seconds, (nets, components, descriptions) = timed(loader.load_file, file_path, use_cache=False, repeat=repeat)
+    stages['load_data'] = {'seconds': seconds, 'nets': len(nets), 'components': len(components),
+                           'pins': sum(len(pins) for pins in components.values()),
+                           'bytes': os.path.getsize(file_path)}
+
+    designators = rng.sample(sorted(components), min(5, len(components)))
+    with open(file_path, 'r', encoding='latin-1') as file:
+        file_content = file.read()
+    seconds, _ = timed(lambda: [loader.extract_description(file_content, d) for d in designators])
+    stages['extract_description'] = {'seconds': seconds / len(designators), 'calls': len(designators)}
+
+    seconds, netlist_graph = timed(graph.create_graph, nets, components, repeat=repeat)
+    stages['create_graph'] = {'seconds': seconds, 'nodes': len(netlist_graph), 'edges': netlist_graph.number_of_edges()}
+
+    # Rails stay in: the search has to cope with their fanout
+    pins = [pin for group in components.values() for pin in group]
+    pairs = [(rng.choice(pins), rng.choice(pins)) for _ in range(queries)]
+    seconds, found = timed(lambda: [graph.find_path_bfs(netlist_graph, s, t) for s, t in pairs])
+    stages['find_path_bfs'] = {'seconds': seconds / queries, 'queries': queries,
+                               'found': sum(1 for paths in found if paths)}
+    seconds, _ = timed(lambda: [graph.find_path_bfs(netlist_graph, s, t, num_path=num_path) for s, t in pairs[:5]])
+    stages['find_path_bfs_k'] = {'seconds': seconds / len(pairs[:5]), 'queries': len(pairs[:5]), 'num_path': num_path}
+
+    seconds, found = timed(lambda: [graph.find_nodes_up_to_depth(netlist_graph, s, depth) for s, _ in pairs])
+    stages['find_nodes_up_to_depth'] = {'seconds': seconds / queries, 'queries': queries, 'depth': depth,
+                                        'nodes': sum(len(nodes) for nodes in found) // queries}
+
+    if importlib.util.find_spec('scipy') is not None:
+        import sparse_search
+        seconds, _ = timed(sparse_search.graph_arrays, netlist_graph)
+        stages['sparse_arrays'] = {'seconds': seconds}
+        seconds, _ = timed(lambda: [graph.find_nodes_up_to_depth(netlist_graph, s, depth, engine='sparse') for s, _ in pairs])
+        stages['find_nodes_up_to_depth_sparse'] = {'seconds': seconds / queries, 'queries': queries, 'depth': depth}
+        seconds, fanout = timed(sparse_search.component_fanout, netlist_graph, depth)
+        stages['component_fanout'] = {'seconds': seconds, 'components': len(fanout), 'depth': depth}
+
+    source = pairs[0][0]
+    with tempfile.TemporaryDirectory() as output_dir:
+        for renderer in ('light', 'pyvis'):
+            output_path = os.path.join(output_dir, f'{renderer}.html')
+            nodes = len(graph.find_nodes_up_to_depth(netlist_graph, source, depth))
+            if renderer == 'pyvis' and nodes > PYVIS_MAX_NODES:
+                continue
+            seconds, _ = timed(graph.graphs, descriptions, nets, components, source, None, depth,
+                               graph=netlist_graph, renderer=renderer, output_path=output_path, open_browser=False)
+            stages[f'html_{renderer}'] = {'seconds': seconds, 'nodes': nodes, 'bytes': os.path.getsize(output_path)}
+
+    return stages
+
+
+def time_startup(command, repeat=3, cwd=None):
+    """Best wall time of command from launch until it exits.
+
+    NETLIST_STARTUP_PROBE makes the GUI exit right after its first window is drawn.
+    """
+    env = dict(os.environ, NETLIST_STARTUP_PROBE='1')
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        process = subprocess.run(command, env=env, cwd=cwd, capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+        if process.returncode != 0:
+            return {'seconds': None, 'error': process.stderr.strip().splitlines()[-1:]}
+        best = elapsed if best is None else min(best, elapsed)
+    return {'seconds': best, 'repeat': repeat}
+
+
+def bench_startup(frozen=None, repeat=3):
+    here = os.path.dirname(os.path.abspath(__file__))
+    stages = {
+        # Headless part of the cold start: what netlist.py imports before the window
+        'import_graph': time_startup([sys.executable, '-c', 'import graph'], repeat, cwd=here),
+        'script': time_startup([sys.executable, os.path.join(here, 'netlist.py')], repeat),
+    }
+    if frozen:
+        stages['frozen'] = time_startup([os.path.abspath(frozen)], repeat)
+    return stages
+
+
+def compare(results, baseline, threshold):
+    """Print stages that got slower than baseline by more than threshold (a ratio)."""
+    regressions = 0
+    groups = dict(results['netlists'])
+    before_groups = dict(baseline.get('netlists', {}))
+    if 'startup' in results:
+        groups['startup'] = results['startup']
+        before_groups['startup'] = baseline.get('startup', {})
+    for name, stages in groups.items():
+        for stage, values in stages.items():
+            before = before_groups.get(name, {}).get(stage)
+            if not values['seconds'] or not before or not before['seconds']:
+                continue
+            ratio = values['seconds'] / before['seconds']
+            flag = ''
+            if ratio > threshold:
+                flag = '  <-- regression'
+                regressions += 1
+            print(f"{name:>16} {stage:<24} {before['seconds']:10.4f}s -> {values['seconds']:10.4f}s  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the netlist graph pipeline")
+    parser.add_argument("--pins", type=int, nargs='*', default=[1000, 10000, 100000], help="Netlist sizes in pins")
+    parser.add_argument("--formats", nargs='+', choices=('kicad', 'kicad_sexpr', 'protel2'), default=['kicad', 'protel2'])
+    parser.add_argument("--queries", type=int, default=20, help="Path and depth queries per netlist")
+    parser.add_argument("--depth", type=int, default=2, help="Depth for find_nodes_up_to_depth")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage, the best is kept")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("-o", "--output", type=str, default="benchmark_results.json", help="Result file")
+    parser.add_argument("--compare", type=str, default=None, help="Earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slowdown ratio reported as a regression")
+    parser.add_argument("--startup", action="store_true", help="Also time netlist.py until its first window")
+    parser.add_argument("--frozen", type=str, default=None, help="PyInstaller executable to time as well (implies --startup)")
+    args = parser.parse_args()
+
+    results = {
+        'revision': git_revision(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'netlists': {},
+    }
+    with tempfile.TemporaryDirectory() as work_dir:
+        for file_format in args.formats:
+            for pins in args.pins:
+                name = f"{file_format}-{pins}"
+                file_path = os.path.join(work_dir, name + '.net')
+                synth_netlist.write_netlist(file_path, pins, file_format, args.seed)
+                results['netlists'][name] = bench_netlist(file_path, args.queries, args.depth, repeat=args.repeat, seed=args.seed)
+                for stage, values in results['netlists'][name].items():
+                    print(f"{name:>16} {stage:<24} {values['seconds']:10.4f}s")
+
+    if args.startup or args.frozen:
+        results['startup'] = bench_startup(args.frozen, args.repeat)
+        for stage, values in results['startup'].items():
+            if values['seconds'] is None:
+                print(f"{'startup':>16} {stage:<24} failed: {' '.join(values['error'])}")
+            else:
+                print(f"{'startup':>16} {stage:<24} {values['seconds']:10.4f}s")
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
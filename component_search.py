@@ -0,0 +1,115 @@
+'''
+Type-ahead search over the components of a loaded netlist.
+
+ComponentIndex is built once per load. The natural-sort keys and each
+component's pin list are computed once, designator prefixes are found by
+bisecting a sorted list, and substring and fuzzy (in-order characters)
+matches on designators and descriptions run over one joined string, so a
+keystroke costs a few C-level scans instead of a Python loop over every entry.
+'''
+import bisect
+import re
+
+import loader
+
+# Entries offered in a dropdown per keystroke
+MAX_RESULTS = 500
+
+NATURAL_PART = re.compile(r'\D+|\d+')
+
+
+def natural_key(text):
+    """Sort key putting R2 before R10; digit runs compare as numbers."""
+    # The leading flag keeps ints and strs from being compared to each other
+    return tuple((0, int(part), '') if part.isdigit() else (1, 0, part) for part in NATURAL_PART.findall(text))
+
+
+def natural_sorted(items):
+    return sorted(items, key=natural_key)
+
+
+def fuzzy_pattern(typed):
+    """Regex matching the characters of typed in order within one line.
+
+    Each gap skips up to the next wanted character with a negated class
+    instead of a lazy .*?, so the regex does not backtrack.
+    """
+    parts = [re.escape(typed[0])]
+    for char in typed[1:]:
+        parts.append(f"[^\\n{re.escape(char)}]*{re.escape(char)}")
+    return re.compile(''.join(parts))
+
+
+class ComponentIndex:
+    """Designators in natural order, their dropdown labels and pins, and the search structures."""
+
+    def __init__(self, components, descriptions):
+        self.components = components
+        self.names = natural_sorted(components)
+        self.labels = [f"{name} ({loader.format_description(descriptions.get(name))})" for name in self.names]
+        self.rank = {name: position for position, name in enumerate(self.names)}
+        self._pins = {}
+
+        # Prefix search: lowercased designators in plain sorted order, with their natural rank
+        by_key = sorted(range(len(self.names)), key=lambda position: self.names[position].lower())
+        self.prefix_keys = [self.names[position].lower() for position in by_key]
+        self.prefix_ranks = by_key
+
+        # Substring and fuzzy search: every lowercased label on its own line
+        lowered = [label.lower() for label in self.labels]
+        self.text = '\n'.join(lowered)
+        self.starts = []
+        position = 0
+        for label in lowered:
+            self.starts.append(position)
+            position += len(label) + 1
+
+    def __len__(self):
+        return len(self.names)
+
+    def pins(self, component):
+        """Pin numbers of a component in natural order, [] for an unknown one."""
+        pins = self._pins.get(component)
+        if pins is None:
+            if component not in self.components:
+                return []
+            pins = self._pins[component] = natural_sorted(pin.split('-')[1] for pin in self.components[component])
+        return pins
+
+    def prefix_ranks_of(self, prefix):
+        """Natural ranks of the designators starting with prefix, case-insensitively."""
+        prefix = prefix.lower()
+        low = bisect.bisect_left(self.prefix_keys, prefix)
+        high = bisect.bisect_left(self.prefix_keys, prefix + '\U0010ffff', low)
+        return sorted(self.prefix_ranks[low:high])
+
+    def _scan(self, pattern, found, limit):
+        """Add the rank of each line pattern matches, one match per line, until limit."""
+        text, starts = self.text, self.starts
+        match = pattern.search(text)
+        while match is not None and len(found) < limit:
+            row = bisect.bisect_right(starts, match.start()) - 1
+            found.setdefault(row)
+            next_row = starts[row + 1] if row + 1 < len(starts) else len(text)
+            match = pattern.search(text, next_row)
+
+    def search(self, typed, limit=MAX_RESULTS):
+        """Return up to limit labels: designator prefix matches, then substring, then fuzzy matches."""
+        typed = typed.strip().lower()
+        if not typed:
+            return self.labels[:limit]
+        # dict keeps the first-found order and drops repeats
+        found = dict.fromkeys(self.prefix_ranks_of(typed)[:limit])
+        if len(found) < limit:
+            self._scan(re.compile(re.escape(typed)), found, limit)
+        if len(found) < limit and len(typed) > 1:
+            self._scan(fuzzy_pattern(typed), found, limit)
+        return [self.labels[row] for row in found]
+
+    def resolve(self, typed):
+        """Return the label the Return key should select: the exact designator, else the best match."""
+        name = typed.strip().split(' ')[0]
+        if name in self.rank:
+            return self.labels[self.rank[name]]
+        found = self.search(name, 1)
+        return found[0] if found else None
@@ -1,71 +1,277 @@
-import networkx as nx
-from pyvis.network import Network
 from collections import deque
+import heapq
+import html
+import os
 
+import instrument
 import loader
+import lod
+import netmodel
+import query_cache
+import rails
+import render
+
+class Cancelled(Exception):
+    """Raised by a search when its cancel event is set."""
+
+
+def check_cancelled(cancel):
+    """Raise Cancelled once cancel (a threading.Event, or None) is set."""
+    if cancel is not None and cancel.is_set():
+        raise Cancelled()
+
+
+def create_graph(nets, components, blacklist_nets=(), blacklist_components=()):
+    return netmodel.NetlistGraph(nets, components, blacklist_nets, blacklist_components)
+
+
+def add_search_counters(counters, nodes_visited, queue_peak):
+    if counters is not None:
+        counters['searches'] = counters.get('searches', 0) + 1
+        counters['nodes_visited'] = counters.get('nodes_visited', 0) + nodes_visited
+        counters['queue_peak'] = max(counters.get('queue_peak', 0), queue_peak)
 
-def create_graph(nets, components, blacklist_nets, blacklist_components):
-    G = nx.Graph()
-    
-    for net, nodes in nets.items():
-        if net in blacklist_nets:
-            continue
-        for node in nodes:
-            G.add_edge(node, net)
-    
-    for component, nodes in components.items():
-        if component in blacklist_components:
-            continue
-        for node in nodes:
-            G.add_edge(node, component)
-    
-    return G
 
+def shortest_path(graph, source, target, is_target_node, excluded, blocked=frozenset(), banned_first=frozenset(), counters=None, cancel=None):
+    """Breadth-first search over node ids, returning the id path or None.
+
+    Nodes in ``blocked`` are never entered and the edges from ``source`` to the
+    ids in ``banned_first`` are skipped. A pin target only counts when it is
+    reached from a net.
+    """
+    names, kinds = graph.names, graph.kinds
+    # The predecessor map doubles as the visited set
+    predecessors = dict.fromkeys(blocked, -1)
+    predecessors[source] = -1
+    queue = deque([source])
+    queue_peak = 1
+
+    try:
+        while queue:
+            if len(queue) > queue_peak:
+                queue_peak = len(queue)
+            check_cancelled(cancel)
+            current_node = queue.popleft()
+            neighbors = graph.neighbors(current_node)
+            if current_node == source and banned_first:
+                neighbors = [neighbor for neighbor in neighbors if neighbor not in banned_first]
+
+            for neighbor in neighbors:
+                if neighbor == target:
+                    if not is_target_node or kinds[current_node] == netmodel.NET:
+                        path = [target]
+                        while current_node != -1:
+                            path.append(current_node)
+                            current_node = predecessors[current_node]
+                        return path[::-1]
+                    continue
+
+                if neighbor not in predecessors and not names[neighbor].startswith(excluded):
+                    predecessors[neighbor] = current_node
+                    queue.append(neighbor)
+
+        return None
+    finally:
+        add_search_counters(counters, len(predecessors) - len(blocked), queue_peak)
+
+
+def bidirectional_path(graph, source, target, is_target_node, excluded, blocked=frozenset(), banned_first=frozenset(), counters=None, cancel=None):
+    """Same contract as shortest_path, growing BFS levels from both ends.
+
+    Each round expands the smaller frontier by one full level. Once the two
+    searches meet, the shortest of the meeting points found in that level wins.
+    """
+    names, kinds = graph.names, graph.kinds
+    forward, backward = {source: -1}, {target: -1}
+    forward_depth, backward_depth = {source: 0}, {target: 0}
+    forward_frontier, backward_frontier = [source], [target]
+    queue_peak = 1
+    best = None
+
+    while forward_frontier and backward_frontier and best is None:
+        check_cancelled(cancel)
+        next_frontier = []
+        if len(forward_frontier) <= len(backward_frontier):
+            for current_node in forward_frontier:
+                depth = forward_depth[current_node] + 1
+                for neighbor in graph.neighbors(current_node):
+                    if current_node == source and neighbor in banned_first:
+                        continue
+                    if neighbor == target:
+                        if not is_target_node or kinds[current_node] == netmodel.NET:
+                            if best is None or depth < best[0]:
+                                best = (depth, current_node, target)
+                        continue
+                    if neighbor in forward or neighbor in blocked or names[neighbor].startswith(excluded):
+                        continue
+                    forward[neighbor] = current_node
+                    forward_depth[neighbor] = depth
+                    next_frontier.append(neighbor)
+                    if neighbor in backward:
+                        length = depth + backward_depth[neighbor]
+                        if best is None or length < best[0]:
+                            best = (length, current_node, neighbor)
+            forward_frontier = next_frontier
+        else:
+            for current_node in backward_frontier:
+                depth = backward_depth[current_node] + 1
+                for neighbor in graph.neighbors(current_node):
+                    if current_node == target and is_target_node and kinds[neighbor] != netmodel.NET:
+                        continue
+                    if neighbor == source:
+                        if current_node not in banned_first:
+                            if best is None or depth < best[0]:
+                                best = (depth, source, current_node)
+                        continue
+                    if neighbor in backward or neighbor in blocked or names[neighbor].startswith(excluded):
+                        continue
+                    backward[neighbor] = current_node
+                    backward_depth[neighbor] = depth
+                    next_frontier.append(neighbor)
+                    if neighbor in forward:
+                        length = depth + forward_depth[neighbor]
+                        if best is None or length < best[0]:
+                            best = (length, neighbor, current_node)
+            backward_frontier = next_frontier
+        queue_peak = max(queue_peak, len(next_frontier))
 
-def find_path_bfs(graph, initial_node, component_target, num_path=1, nets=None):
+    add_search_counters(counters, len(forward) + len(backward), queue_peak)
+    if best is None:
+        return None
+
+    # best holds an edge (u, v) with u on the source side and v on the target side
+    _, node, meeting = best
+    path = []
+    while node != -1:
+        path.append(node)
+        node = forward[node]
+    path.reverse()
+    while meeting != -1:
+        path.append(meeting)
+        meeting = backward[meeting]
+    return path
+
+
+def k_shortest_paths(graph, source, target, num_path, is_target_node, excluded, blocked=frozenset(), search=None, counters=None, cancel=None):
+    """Yen's algorithm: up to num_path loopless id paths in order of length."""
+    search = search or bidirectional_path
+    path = search(graph, source, target, is_target_node, excluded, blocked, counters=counters, cancel=cancel)
+    if path is None:
+        return []
+    paths = [path]
+    seen = {tuple(path)}
+    candidates = []
+
+    while len(paths) < num_path:
+        last = paths[-1]
+        for i in range(len(last) - 1):
+            root = last[:i + 1]
+            # Leave the root through an edge no accepted path with this root used
+            banned_first = {p[i + 1] for p in paths if p[:i + 1] == root}
+            spur_blocked = set(blocked)
+            spur_blocked.update(root[:-1])
+            spur = search(graph, last[i], target, is_target_node, excluded, spur_blocked, banned_first, counters, cancel)
+            if spur is None:
+                continue
+            candidate = root[:-1] + spur
+            if tuple(candidate) not in seen:
+                seen.add(tuple(candidate))
+                heapq.heappush(candidates, (len(candidate), len(seen), candidate))
+        if not candidates:
+            break
+        paths.append(heapq.heappop(candidates)[2])
+
+    return paths
+
+
+def find_path_bfs(graph, initial_node, component_target, num_path=1, nets=None, blocked=frozenset(), bidirectional=True, verbose=True, counters=None, cancel=None):
+    source = graph.index.get(initial_node)
+    target = graph.index.get(component_target)
+    if source is None or target is None or source in blocked or target in blocked:
+        return None
+    if not graph.connectivity(blocked).connected(source, target):
+        # Split apart by the blacklist (or never joined): no search can succeed
+        if counters is not None:
+            counters['unreachable'] = counters.get('unreachable', 0) + 1
+        return None
     is_target_node = '-' in component_target
-    
-    queue = deque([(initial_node, [initial_node])])
-    visited = set([initial_node])
+    excluded = ('Comp', initial_node.split('-')[0])
 
     paths = []
-    while queue and len(paths) < num_path:
-        current_node, path_s = queue.popleft()
-
-        for neighbor in graph.neighbors(current_node):
-            if neighbor == component_target:
-                if not is_target_node or (is_target_node and current_node in nets):
-                    paths.append(path_s + [neighbor])
-                    print(f"Path found: {' -> '.join(path_s + [neighbor])}")
-                    if len(paths) >= num_path:
-                        return paths
-                continue
-            
-            if neighbor not in visited and not neighbor.startswith('Comp') and not neighbor.startswith(initial_node.split('-')[0]):
-                queue.append((neighbor, path_s + [neighbor]))
-                visited.add(neighbor)
+    search = bidirectional_path if bidirectional else shortest_path
+    for path in k_shortest_paths(graph, source, target, num_path, is_target_node, excluded, blocked, search, counters, cancel):
+        paths.append([graph.names[node] for node in path])
+        if verbose:
+            print(f"Path found: {' -> '.join(paths[-1])}")
 
     return paths if paths else None
 
 
-def find_nodes_up_to_depth(graph, initial_node, max_depth):
-    queue = deque([(initial_node, 0)])
-    visited = set([initial_node])
-    nodes_found = {initial_node}
+def find_nodes_up_to_depth(graph, initial_node, max_depth, blocked=frozenset(), counters=None, cancel=None, engine='python', terminal=frozenset()):
+    """Names within max_depth of initial_node. Nodes in ``terminal`` are reached but not expanded."""
+    if engine == 'sparse':
+        # Whole BFS levels as NumPy/SciPy vector operations, see sparse_search.py
+        import sparse_search
+        return sparse_search.find_nodes_up_to_depth(graph, initial_node, max_depth, blocked, counters, cancel, terminal)
+    source = graph.index.get(initial_node)
+    if source is None or source in blocked:
+        return {initial_node}
+    excluded = ('Comp', initial_node.split('-')[0])
+    names = graph.names
+
+    frontier = [source]
+    visited = set(blocked)
+    visited.add(source)
+    queue_peak = 1
+    # Once the source's component without the blocked nodes is visited there
+    # is nothing left to expand; the blocked ones are in visited from the start
+    limit = len(blocked) + graph.connectivity(blocked).component_size(source)
 
-    while queue:
-        current_node, depth = queue.popleft()
-        if depth < max_depth:
+    for depth in range(max_depth):
+        if len(visited) >= limit:
+            break
+        check_cancelled(cancel)
+        next_frontier = []
+        for current_node in frontier:
             for neighbor in graph.neighbors(current_node):
-                if neighbor not in visited and not neighbor.startswith('Comp') and not neighbor.startswith(initial_node.split('-')[0]):
+                if neighbor not in visited and not names[neighbor].startswith(excluded):
                     visited.add(neighbor)
-                    nodes_found.add(neighbor)
-                    queue.append((neighbor, depth + 1))
-    
-    return nodes_found
+                    if neighbor not in terminal:
+                        next_frontier.append(neighbor)
+        if not next_frontier:
+            break
+        frontier = next_frontier
+        queue_peak = max(queue_peak, len(frontier))
+
+    add_search_counters(counters, len(visited) - len(blocked), queue_peak)
+    return {names[node] for node in visited.difference(blocked)}
+
 
+def run_query(graph, initial_node, component_target=None, max_depth=0, blacklist_nets=(), blacklist_components=(), num_path=1, verbose=True, stats=None, cancel=None,
+              engine='python', terminal_nets=()):
+    """Return the paths and the nodes up to max_depth for one query, without rendering.
+
+    terminal_nets (collapsed rails) show up in the depth search but are not
+    expanded, and no path goes through them.
+    """
+    blocked = graph.blocked_nodes(blacklist_nets, blacklist_components)
+    terminal = graph.blocked_nodes(terminal_nets) - blocked
+    path_s = []
+    if component_target is not None:
+        with instrument.stage(stats, 'path_search') as counters:
+            path_s = find_path_bfs(graph, initial_node, component_target, num_path=num_path, blocked=blocked | terminal, verbose=verbose, counters=counters, cancel=cancel) or []
+            if counters is not None:
+                counters['paths'] = len(path_s)
+    with instrument.stage(stats, 'depth_search') as counters:
+        nodes_found = find_nodes_up_to_depth(graph, initial_node, max_depth, blocked=blocked, counters=counters, cancel=cancel, engine=engine, terminal=terminal)
+    return path_s, nodes_found
 
-def generate_html_parameters(initial_node, component_target, max_depth, blacklist_nets, blacklist_components, num_path):
+
+def generate_html_parameters(initial_node, component_target, max_depth, blacklist_nets, blacklist_components, num_path, stats=None,
+                             rail_mode='off', rail_nets=()):
+    timings_html = ''
+    if stats is not None:
+        timings_html = '<h3>Timings</h3><ul>' + ''.join(f"<li>{html.escape(line)}</li>" for line in stats.summary_lines()) + '</ul>'
     parameters_html = f"""
     <style>
         .parameters-container {{
@@ -87,70 +293,82 @@ def generate_html_parameters(initial_node, component_target, max_depth, blacklis
             <li><strong>Number of Paths:</strong> {num_path}</li>
             <li><strong>Nets in the Blacklist:</strong> {', '.join(blacklist_nets)}</li>
             <li><strong>Components in the Blacklist:</strong> {', '.join(blacklist_components)}</li>
+            <li><strong>High-fanout rails:</strong> {html.escape(rails.describe(rail_mode, rail_nets))}</li>
         </ul>
+        {timings_html}
     </div>
     """
     return parameters_html
 
 
-def graphs(file_content, nets, components, initial_node, component_target=None, max_depth=None, blacklist_nets=None, blacklist_components=None,num_path=1):
-    if blacklist_components is None: blacklist_components = ''
-    if blacklist_nets is None: blacklist_nets = ''
-    if max_depth is None: max_depth = 0
-    elif max_depth < 0: max_depth = 0
-    
-    graph = create_graph(nets, components, blacklist_nets, blacklist_components)
+def subgraph_elements(graph, subgraph, descriptions, initial_node, component_target, counters=None, collapsed=()):
+    """Return generators of vis node and edge dicts for the node id set subgraph.
 
-    if component_target is not None:
-        path_s = find_path_bfs(graph, initial_node, component_target,num_path=num_path,nets=nets)
-        if path_s:
-            for i, path in enumerate(path_s, 1):
-                print(f"Path {i} found: {' -> '.join(path)}")
-        else:
-            print("No path found.")
-            component_target = None
-            path_s = []
-    else: path_s = []
+    Net names in ``collapsed`` are drawn as one rail node showing its pin count.
+
+    When given, counters receives the number of nodes, edges and description
+    lookups once the generators are exhausted.
+    """
+    if counters is None:
+        counters = {}
+    counters.update(nodes=0, edges=0, descriptions=0)
+
+    def nodes():
+        for node_id in sorted(subgraph):
+            counters['nodes'] += 1
+            node = graph.names[node_id]
+            kind = graph.kinds[node_id]
+            title_info = None
+            
+            if kind == netmodel.NET: shapeif='text'
+            elif kind == netmodel.COMPONENT: 
+                shapeif='square'
+                title_info=loader.format_description(descriptions.get(node))
+                counters['descriptions'] += 1
+            else: shapeif='box'
+            
+            if (node == initial_node): 
+                colorif='lime'
+                labelif='Source '+initial_node
+            elif (node == component_target): 
+                colorif='red'
+                labelif='Target '+component_target
+            elif node in collapsed:
+                shapeif='star'
+                colorif='orange'
+                labelif=f"{node} ({len(graph.neighbors(node_id))} pins)"
+            else: 
+                colorif=None
+                labelif=None
 
-    nodes_found = find_nodes_up_to_depth(graph, initial_node, max_depth)
-    print(f"Nodes found up to depth {max_depth}: {', '.join(nodes_found)}")
+            yield {'id': node, 'label': labelif or node, 'color': colorif, 'shape': shapeif, 'title': title_info}
 
-    subgraph_nodes = set(nodes_found).union(set(node for path in path_s for node in path))
-    subgraph_edges = [(u, v) for u, v in graph.edges() if u in subgraph_nodes and v in subgraph_nodes]
-
-    subgraph = graph.subgraph(subgraph_nodes)
-
-    net = Network(notebook=True, cdn_resources='in_line', width="100%", height="100vh")
-
-    for node in subgraph.nodes():
-        title_info = None
-        
-        if node in nets: shapeif='text'
-        elif node in components: 
-            shapeif='square'
-            title_info=loader.extract_description(file_content, node)
-        else: shapeif='box'
-        
-        if (node == initial_node): 
-            colorif='lime'
-            labelif='Source '+initial_node
-        elif (node == component_target): 
-            colorif='red'
-            labelif='Target '+component_target
-        else: 
-            colorif=None
-            labelif=None
-        
-        if title_info is None: net.add_node(node, label=labelif, color=colorif,shape=shapeif)
-        else: net.add_node(node, label=labelif, color=colorif,shape=shapeif,title=title_info)
-
-    for edge in subgraph.edges():
-        if edge[0] in nets or edge[1] in nets:
-            net.add_edge(edge[0], edge[1], color='red', width=1)
-        else:
-            net.add_edge(edge[0], edge[1], color='blue', width=5)
+    def edges():
+        for u, v in graph.edges_within(subgraph):
+            counters['edges'] += 1
+            if graph.kinds[u] == netmodel.NET or graph.kinds[v] == netmodel.NET:
+                yield {'from': graph.names[u], 'to': graph.names[v], 'color': 'red', 'width': 1}
+            else:
+                yield {'from': graph.names[u], 'to': graph.names[v], 'color': 'blue', 'width': 5}
 
-    html_content = net.generate_html()
+    return nodes(), edges()
+
+
+def write_pyvis_html(file_path, nodes, edges, parameters_html, stats=None):
+    # pyvis pulls in jinja2 and IPython; import it on first use, not at startup
+    from pyvis.network import Network
+
+    with instrument.stage(stats, 'render'):
+        net = Network(notebook=True, cdn_resources='in_line', width="100%", height="100vh")
+
+        for node in nodes:
+            if node['title'] is None: net.add_node(node['id'], label=node['label'], color=node['color'], shape=node['shape'])
+            else: net.add_node(node['id'], label=node['label'], color=node['color'], shape=node['shape'], title=node['title'])
+
+        for edge in edges:
+            net.add_edge(edge['from'], edge['to'], color=edge['color'], width=edge['width'])
+
+        html_content = net.generate_html()
 
     css_styles = """
     <style>
@@ -162,12 +380,149 @@ def graphs(file_content, nets, components, initial_node, component_target=None,
     </style>
     """
     html_content = html_content.replace('<head>', '<head>' + css_styles)
-
-    parameters_html = generate_html_parameters(initial_node, component_target, max_depth, blacklist_nets, blacklist_components,num_path)
     html_content = html_content.replace('</body>', parameters_html + '</body>')
     
-    with open("graph.html", "w", encoding="utf-8") as f:
-        f.write(html_content)
+    with instrument.stage(stats, 'write') as counters:
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(html_content)
+            bytes_written = f.tell()
+        if counters is not None:
+            counters['bytes'] = bytes_written
+    return bytes_written
+
+
+def graphs(descriptions, nets, components, initial_node, component_target=None, max_depth=None, blacklist_nets=None, blacklist_components=None,num_path=1, graph=None,
+           renderer='pyvis', output_path="graph.html", open_browser=True, stats=None, show_stats=False, cancel=None, cache=None, engine='python',
+           rail_mode='off', rail_min_pins=rails.MIN_PINS, rail_min_share=rails.MIN_SHARE, live_reload=False,
+           verbose=True, node_budget=None):
+    """Run one query, write it to output_path and return its instrument.Stats.
+
+    Pass stats=instrument.Stats(profile=True) to also profile every stage;
+    show_stats adds the timings to the parameters panel and prints them.
+    Setting the cancel event (a threading.Event) from another thread stops the
+    searches with Cancelled, before anything is written.
+    With a query_cache.QueryCache and a prebuilt graph, repeated queries reuse
+    the earlier paths, nodes and page. engine='sparse' runs the depth search
+    with NumPy/SciPy (sparse_search.py).
+    rail_mode is one of rails.RAIL_MODES: the nets rails.classify_rails finds
+    with the given thresholds are only listed ('suggest'), added to the net
+    blacklist ('blacklist') or kept as nodes the searches do not expand
+    ('collapse').
+    live_reload makes the page reload itself whenever a later call rewrites
+    output_path (render.write_version), so watch mode can refresh an open
+    tab instead of opening a new one. verbose=False skips printing the paths
+    and nodes found.
+    With the light renderer, node_budget caps the nodes drawn at first: past
+    it the page shows the source, target and paths in detail, folds the pins
+    of other components and clusters distant nodes (lod.py), expanding them
+    on double-click.
+    """
+    if blacklist_components is None: blacklist_components = ''
+    if blacklist_nets is None: blacklist_nets = ''
+    if max_depth is None: max_depth = 0
+    elif max_depth < 0: max_depth = 0
+    
+    if stats is None:
+        stats = instrument.Stats()
+
+    if graph is None:
+        with stats.stage('create_graph') as counters:
+            graph = create_graph(nets, components)
+            counters.update(nodes=len(graph), edges=graph.number_of_edges())
+
+    rail_nets = []
+    terminal_nets = []
+    if rail_mode != 'off':
+        rail_nets = rails.graph_rails(graph, nets, rail_min_pins, rail_min_share)
+        if rail_mode == 'blacklist':
+            listed = set(blacklist_nets)
+            blacklist_nets = list(blacklist_nets) + [net for net in rail_nets if net not in listed]
+        elif rail_mode == 'collapse':
+            terminal_nets = rail_nets
+
+    cached = None
+    if cache is not None:
+        key = query_cache.normalize_query(initial_node, component_target, max_depth, blacklist_nets, blacklist_components, num_path,
+                                          rail_mode, rail_nets)
+        with stats.stage('cache') as counters:
+            cached = cache.get(graph, key)
+            counters['hit'] = cached is not None
+    if cached is not None:
+        path_s, nodes_found = cached.paths, set(cached.nodes)
+    else:
+        path_s, nodes_found = run_query(graph, initial_node, component_target, max_depth, blacklist_nets, blacklist_components, num_path, stats=stats, cancel=cancel,
+                                        engine=engine, terminal_nets=terminal_nets, verbose=verbose)
+        check_cancelled(cancel)
+        if cache is not None:
+            cache.put(graph, key, path_s, nodes_found)
+    if component_target is not None:
+        if path_s:
+            if verbose:
+                for i, path in enumerate(path_s, 1):
+                    print(f"Path {i} found: {' -> '.join(path)}")
+        else:
+            if verbose:
+                print("No path found.")
+            component_target = None
+
+    if verbose:
+        print(f"Nodes found up to depth {max_depth}: {', '.join(nodes_found)}")
+
+    # Pages with and without the reload script are cached apart
+    page_kind = renderer + ('-live' if live_reload else '') + (f"-lod{node_budget}" if node_budget else '')
+    # A page with timings in it is specific to this run
+    page = cached.html.get(page_kind) if cached is not None and not show_stats else None
+    if page is not None:
+        with stats.stage('write') as counters:
+            if renderer == 'light':
+                render.ensure_assets(os.path.dirname(os.path.abspath(output_path)))
+            with open(output_path, 'wb') as f:
+                f.write(page)
+            counters['bytes'] = len(page)
+        return finish_graphs(output_path, open_browser, stats, show_stats, live_reload)
+
+    subgraph_nodes = set(nodes_found).union(set(node for path in path_s for node in path))
+    subgraph = {graph.index[node] for node in subgraph_nodes if node in graph}
+
+    # Rendering can only report the stages that ran before it
+    parameters_html = generate_html_parameters(initial_node, component_target, max_depth, blacklist_nets, blacklist_components,num_path,
+                                               stats if show_stats else None, rail_mode, rail_nets)
+    if live_reload:
+        parameters_html += render.reload_script(output_path)
+    if renderer == 'light':
+        with stats.stage('render') as counters:
+            nodes, edges = subgraph_elements(graph, subgraph, descriptions, initial_node, component_target, counters, set(terminal_nets))
+            if node_budget and len(subgraph) > node_budget:
+                focus_nodes = [initial_node, component_target] + [node for path in path_s for node in path]
+                focus = {graph.index[node] for node in focus_nodes if node in graph.index}
+                lod_plan = lod.plan_lod(graph, subgraph, focus & subgraph, node_budget)
+                drawn, hidden, owner, expanded = lod.lod_elements(graph, lod_plan, nodes, counters)
+                counters['bytes'] = render.write_lod_html(output_path, drawn, hidden, owner, expanded, lod_plan.clusters, edges, parameters_html)
+            else:
+                counters['bytes'] = render.write_html(output_path, nodes, edges, len(subgraph), parameters_html)
+    else:
+        element_counters = {}
+        nodes, edges = subgraph_elements(graph, subgraph, descriptions, initial_node, component_target, element_counters, set(terminal_nets))
+        write_pyvis_html(output_path, nodes, edges, parameters_html, stats)
+        stats.stages['render'].update(element_counters)
+
+    if cache is not None and cache.keep_html and not show_stats:
+        with open(output_path, 'rb') as f:
+            cache.put_html(key, page_kind, f.read())
+
+    return finish_graphs(output_path, open_browser, stats, show_stats, live_reload)
+
+
+def finish_graphs(output_path, open_browser, stats, show_stats, live_reload=False):
+    if live_reload:
+        render.write_version(output_path)
+
+    if show_stats:
+        for line in stats.summary_lines():
+            print(line)
+
+    if open_browser:
+        import webbrowser
+        webbrowser.open(output_path)
 
-    import webbrowser
-    webbrowser.open("graph.html")
\ No newline at end of file
+    return stats
@@ -0,0 +1,66 @@
+'''
+Per-stage timing and counters for one query.
+'''
+import contextlib
+import io
+import time
+
+
+class Stats:
+    """Wall time and counters per stage, with an optional cProfile run around each stage.
+
+    on_stage, when given, is called with each stage name as the stage starts,
+    which the GUI uses to report progress.
+    """
+
+    def __init__(self, profile=False, on_stage=None):
+        self.stages = {}
+        self.on_stage = on_stage
+        self.profiler = None
+        if profile:
+            import cProfile
+            self.profiler = cProfile.Profile()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time a block; yields the stage's counter dict to fill in."""
+        counters = self.stages.setdefault(name, {'seconds': 0.0})
+        if self.on_stage is not None:
+            self.on_stage(name)
+        if self.profiler is not None:
+            self.profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield counters
+        finally:
+            counters['seconds'] += time.perf_counter() - start
+            if self.profiler is not None:
+                self.profiler.disable()
+
+    def total_seconds(self):
+        return sum(counters['seconds'] for counters in self.stages.values())
+
+    def as_dict(self):
+        return {name: dict(counters) for name, counters in self.stages.items()}
+
+    def summary_lines(self):
+        lines = []
+        for name, counters in self.stages.items():
+            extra = ', '.join(f"{key}={value}" for key, value in counters.items() if key != 'seconds')
+            lines.append(f"{name}: {counters['seconds'] * 1000:.1f} ms" + (f" ({extra})" if extra else ''))
+        return lines
+
+    def profile_text(self, limit=25):
+        if self.profiler is None:
+            return ''
+        import pstats
+        output = io.StringIO()
+        pstats.Stats(self.profiler, stream=output).sort_stats('cumulative').print_stats(limit)
+        return output.getvalue()
+
+
+def stage(stats, name):
+    """stats.stage(name), or a no-op yielding None when stats is None."""
+    if stats is None:
+        return contextlib.nullcontext(None)
+    return stats.stage(name)
@@ -1,81 +1,548 @@
 import argparse
+import gc
+import hashlib
+import io
+import itertools
+import marshal
+import mmap
+import os
+import re
+import tempfile
+from array import array
+from collections.abc import Mapping
 
-def load_data(file_content):
-    if "PROTEL" in file_content:
-        # Protel2 format
-        components, nets = parse_protel2_netlist(file_content)
-    elif "EESchema" in file_content:
-        # Kicad format
-        components, nets=parse_kicad_netlist(file_content)
-    else:
-        raise ValueError("Unknown file format.")
-    
-    return nets, components
+import netmodel
+
+# Component section fields kept in the description index
+PROTEL2_FIELDS = ('DESIGNATOR', 'Comment', 'DESCRIPTION')
+
+# Bump whenever the parsers change their output, so cached results are dropped
+PARSER_VERSION = 2
+
+CACHE_DIR = os.environ.get('NETLIST_GRAPH_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'netlist-graph'))
+CACHE_MAX_BYTES = 1024 * 1024 * 1024
+# Snapshot headers: the packed string table (pack_snapshot), or plain marshal
+CACHE_MAGIC = b'NLG2'
+CACHE_MAGIC_MARSHAL = b'NLGC'
+
+# Netlist formats by name, as (sniff, parse), tried in registration order
+PARSERS = {}
+
+# Formats parse_file_parallel can split, as (boundary, nets_replace). The
+# boundary regex finds a line where a block starts and the parser holds no
+# state; its group marks the cut. nets_replace says a net repeated in a later
+# chunk replaces the earlier pins, as the parser does within one file.
+CHUNK_FORMATS = {
+    # A '[' component or '(' net line right after the line closing the previous block
+    'protel2': (re.compile(rb'[\])][ \t]*\r?\n()[ \t]*[\[(][ \t]*\r?\n'), True),
+    # A ( /uuid component header
+    'kicad': (re.compile(rb'\n()[ \t]*\( /'), False),
+}
+# Smaller files are not worth starting a process pool for
+PARALLEL_MIN_BYTES = 32 * 1024 * 1024
+# Chunks per worker, so a slow chunk does not leave the others idle
+CHUNKS_PER_WORKER = 4
+
+# S-expression tokens, as (node ref, node pin, leaf head, leaf atom, other token).
+# Most of an export is (node (ref ..) (pin ..) ...) and leaf lists holding only
+# atoms, like (value "10k"), so those are matched whole. Other tokens are
+# parens, atoms and a string cut by the end of a line. Atoms keep their quotes.
+SEXPR_STRING = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+SEXPR_ATOM = rf'{SEXPR_STRING}|[^\s()"]+'
+SEXPR_LEAF_REST = rf'[^()"]*(?:{SEXPR_STRING}[^()"]*)*\)'
+SEXPR_TOKEN = re.compile(
+    rf'\s*(?:\(node\s+\(ref\s+({SEXPR_ATOM})\s*\)\s*\(pin\s+({SEXPR_ATOM})\s*\)(?:\s*\([^\s()"]+{SEXPR_LEAF_REST})*\s*\)'
+    rf'|\(([^\s()"]+)\s+({SEXPR_ATOM}){SEXPR_LEAF_REST}'
+    rf'|([()]|{SEXPR_ATOM}|"[^"\\]*(?:\\.[^"\\]*)*))', re.S)
+# A whole line holding one node list, one leaf list or a list of leaf lists
+# only, then any closing parens, written the way KiCad writes them: single
+# spaces and strings without escapes. A list of leaves, like (libsource (lib ..)
+# (part ..)), sets nothing outside itself unless it is a node, net or comp,
+# so it yields no tokens. Other lines go through SEXPR_TOKEN; matching the
+# line once is much cheaper than finding its tokens one by one.
+SEXPR_LINE_ATOM = r'(?:"[^"\\]*"|[^\s()"]+)'
+SEXPR_LINE = re.compile(
+    rf'\s*\((?:node \(ref ({SEXPR_LINE_ATOM})\) \(pin ({SEXPR_LINE_ATOM})\)(?: \([^\s()"]+(?: {SEXPR_LINE_ATOM})+\))*\)'
+    rf'|([^\s()"]+) ({SEXPR_LINE_ATOM})(?: {SEXPR_LINE_ATOM})*\)'
+    rf'|(?!(?:node|net|comp) )[^\s()"]+(?: \([^\s()"]+(?: {SEXPR_LINE_ATOM})+\))+\))(\)*)\s*$')
+SEXPR_COMPLETE_STRING = re.compile(SEXPR_STRING, re.S)
+SEXPR_ESCAPE = re.compile(r'\\(.)', re.S)
+
+def iter_lines(source):
+    """Return an iterator over the text lines of a string, a text/binary file object or an mmap.
+
+    Text sources are iterated directly and binary ones decoded line by line
+    with map, so no Python code runs per line.
+    """
+    if isinstance(source, str):
+        return iter(io.StringIO(source))
+    if isinstance(source, io.TextIOBase):
+        return iter(source)
+    return map(latin1_decode, iter(source.readline, b''))
+
+
+def latin1_decode(line):
+    return line.decode('latin-1')
+
+
+def register_parser(name, sniff, parse):
+    """Add a netlist format, or replace the one registered under name.
+
+    sniff(header) gets the first non-blank line and says whether the file is
+    in this format. parse(lines) gets an iterator over every line, header
+    included, and returns (component_pins, nets, descriptions) like
+    parse_kicad_netlist. Descriptions should use the keys format_description
+    knows ('value', or 'comment' and 'description').
+    """
+    PARSERS[name] = (sniff, parse)
+
+
+def detect_format(header):
+    for name, (sniff, _) in PARSERS.items():
+        if sniff(header):
+            return name
+    raise ValueError("Unknown file format.")
+
+
+def load_data(source):
+    lines = iter_lines(source)
+    header = ''
+    for header in lines:
+        if header.strip():
+            break
+    _, parse = PARSERS[detect_format(header)]
+    components, nets, descriptions = parse(itertools.chain([header], lines))
+    return nets, components, descriptions
+
+
+def load_file(file_path, use_cache=True, digest=None, workers=None, with_graph=False):
+    """Parse file_path, or load it from the cache; digest skips hashing the file again.
+
+    Returns (nets, components, descriptions), plus the netmodel.NetlistGraph
+    of the netlist with with_graph. Loaded from the cache, the three are
+    read-only SnapshotGroups and the graph comes straight from the snapshot.
+    With workers > 1 a large Protel2 or legacy KiCad file is parsed in that
+    many processes (parse_file_parallel).
+    """
+    if not use_cache:
+        data = parse_file(file_path, workers)
+        return data + (netmodel.NetlistGraph(data[0], data[1]),) if with_graph else data
+
+    key = cache_key(digest or file_digest(file_path))
+    cached = read_cache(key, with_graph=with_graph)
+    if cached is not None and (not with_graph or cached[3] is not None):
+        return cached if with_graph else cached[:3]
+
+    # A miss, or a snapshot written without the graph
+    data = cached[:3] if cached is not None else parse_file(file_path, workers)
+    graph = netmodel.NetlistGraph(data[0], data[1]) if with_graph else None
+    write_cache(key, data, graph=graph)
+    return data + (graph,) if with_graph else data
+
+
+def parse_file(file_path, workers=None):
+    if workers and workers > 1 and os.path.getsize(file_path) >= PARALLEL_MIN_BYTES:
+        data = parse_file_parallel(file_path, workers)
+        if data is not None:
+            return data
+    with open(file_path, 'r', encoding='latin-1') as file:
+        return load_data(file)
+
+
+def chunk_offsets(snapshot, boundary, chunk_count):
+    """Return (start, end) byte ranges cutting snapshot into about chunk_count pieces at boundary."""
+    size = len(snapshot)
+    offsets = [0]
+    for chunk in range(1, chunk_count):
+        match = boundary.search(snapshot, max(size * chunk // chunk_count, offsets[-1]))
+        if match is None:
+            break
+        if match.start(1) > offsets[-1]:
+            offsets.append(match.start(1))
+    offsets.append(size)
+    return list(zip(offsets, offsets[1:]))
+
+
+def _parse_chunk(task):
+    file_path, start, end, name = task
+    with open(file_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as snapshot:
+        text = snapshot[start:end].decode('latin-1')
+    return PARSERS[name][1](text)
+
+
+def merge_chunks(parts, nets_replace):
+    """Combine the (component_pins, nets, descriptions) of consecutive chunks as one parse would.
+
+    The first chunk's dicts are kept and every later one is added with
+    dict.update, which leaves names seen before in their place; only the
+    names found in both are merged one by one.
+    """
+    merged = None
+    for part in parts:
+        if merged is None:
+            merged = part
+            continue
+        (component_pins, nets, descriptions), (part_components, part_nets, part_descriptions) = merged, part
+        for groups, part_groups, extend in ((component_pins, part_components, True), (nets, part_nets, not nets_replace)):
+            if extend:
+                for name in groups.keys() & part_groups.keys():
+                    groups[name].extend(part_groups[name])
+                    part_groups[name] = groups[name]
+            groups.update(part_groups)
+        # The first description wins
+        for name in descriptions.keys() & part_descriptions.keys():
+            part_descriptions[name] = descriptions[name]
+        descriptions.update(part_descriptions)
+    return merged if merged is not None else ({}, {}, {})
+
+
+def parse_file_parallel(file_path, workers=None, chunk_count=None):
+    """Parse file_path in chunks on a process pool and return (nets, components, descriptions).
+
+    The file is mapped and cut only where CHUNK_FORMATS says a block starts;
+    every worker maps it again and parses its own byte range, and the chunks
+    are merged in file order, so the result equals load_data's. Returns None
+    for formats that cannot be split, like S-expressions, whose lists nest
+    across the whole file, and when fewer than two cores would parse.
+    """
+    # More processes than cores only add start-up and pickling
+    workers = min(workers or os.cpu_count() or 1, os.cpu_count() or 1)
+    if workers < 2:
+        return None
+    # Deferred: multiprocessing is slow to import and most loads never get here
+    from concurrent.futures import ProcessPoolExecutor
+
+    with open(file_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as snapshot:
+        header = ''
+        for header in iter_lines(snapshot):
+            if header.strip():
+                break
+        name = detect_format(header)
+        if name not in CHUNK_FORMATS:
+            return None
+        boundary, nets_replace = CHUNK_FORMATS[name]
+        ranges = chunk_offsets(snapshot, boundary, chunk_count or workers * CHUNKS_PER_WORKER)
+
+    tasks = [(file_path, start, end, name) for start, end in ranges]
+    # Unpickling the chunks creates millions of lists and strings; left on,
+    # the cyclic collector would rescan them over and over
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            component_pins, nets, descriptions = merge_chunks(pool.map(_parse_chunk, tasks), nets_replace)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return nets, component_pins, descriptions
+
+
+def file_digest(file_path):
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(digest):
+    # marshal output is only guaranteed to load with the same format version
+    return f"{digest}-p{PARSER_VERSION}-m{marshal.version}"
+
+
+class SnapshotGroups(Mapping):
+    """Read-only {name: value} over the id arrays of a cache snapshot.
+
+    Keys are the strings at ``keys``; the value of row i is built by
+    ``build(strings, members[offsets[i]:offsets[i + 1]])`` the first time it
+    is asked for, so opening a cached netlist does not create a list per net
+    up front.
+    """
+
+    def __init__(self, strings, keys, offsets, members, build):
+        self.strings = strings
+        self.keys_ids = keys
+        self.offsets = offsets
+        self.members = members
+        self.build = build
+        self.rows = None
+        self.built = {}
+
+    def _rows(self):
+        if self.rows is None:
+            self.rows = dict(zip(map(self.strings.__getitem__, self.keys_ids), range(len(self.keys_ids))))
+        return self.rows
+
+    def __getitem__(self, key):
+        value = self.built.get(key)
+        if value is None:
+            row = self._rows()[key]
+            start, end = self.offsets[row], self.offsets[row + 1]
+            value = self.built[key] = self.build(self.strings, self.members[start:end])
+        return value
+
+    def __contains__(self, key):
+        return key in self._rows()
+
+    def __iter__(self):
+        return map(self.strings.__getitem__, self.keys_ids)
+
+    def __len__(self):
+        return len(self.keys_ids)
+
+
+def snapshot_list(strings, ids):
+    return list(map(strings.__getitem__, ids))
+
+
+def snapshot_fields(strings, ids):
+    # Alternating field name and value ids; -1 stands for a None value
+    return {strings[key]: strings[value] if value != -1 else None for key, value in zip(ids[::2], ids[1::2])}
+
+
+def pack_snapshot(data, graph=None):
+    """Return the cache snapshot of (nets, components, descriptions), or None.
+
+    Every string is stored once in a newline-joined text, in the order
+    NetlistGraph interns them, and the structure in int arrays indexing it.
+    With a freshly built graph its CSR arrays are stored too, so a cache hit
+    skips building it again. None when a name holds a newline or a value is
+    neither a string nor None; the caller then falls back to marshal.
+    """
+    nets, components, descriptions = data
+    strings = []
+    index = {}
+
+    def intern(name):
+        position = index.get(name)
+        if position is None:
+            position = index[name] = len(strings)
+            strings.append(name)
+        return position
+
+    groups = []
+    for group_dict in (nets, components):
+        keys, offsets, members = array('i'), array('i', [0]), array('i')
+        for name, pins in group_dict.items():
+            keys.append(intern(name))
+            # Same order as NetlistGraph: the group, then its new pins
+            members.extend(map(intern, pins))
+            offsets.append(len(members))
+        groups.append((keys, offsets, members))
+    node_count = len(strings)
+
+    keys, offsets, members = array('i'), array('i', [0]), array('i')
+    for name, fields in descriptions.items():
+        if not isinstance(fields, dict) or not all(value is None or isinstance(value, str) for value in fields.values()):
+            return None
+        keys.append(intern(name))
+        for key, value in fields.items():
+            members.append(intern(key))
+            members.append(-1 if value is None else intern(value))
+        offsets.append(len(members))
+    groups.append((keys, offsets, members))
+
+    if not all(isinstance(name, str) for name in strings):
+        return None
+    text = '\n'.join(strings)
+    if text.count('\n') != max(len(strings) - 1, 0):
+        return None
+    graph_arrays = (b'', b'', b'')
+    if graph is not None and not graph.patch and graph.names == strings[:node_count]:
+        graph_arrays = (graph.kinds.tobytes(), graph.offsets.tobytes(), graph.targets.tobytes())
+    return marshal.dumps((len(strings), node_count, text.encode('utf-8', 'surrogatepass'), graph_arrays,
+                          tuple(tuple(part.tobytes() for part in group) for group in groups)))
+
+
+def unpack_snapshot(buffer, with_graph=False):
+    """Return (nets, components, descriptions, graph or None) from pack_snapshot's bytes.
+
+    The three mappings are SnapshotGroups; the graph is only built with with_graph.
+    """
+    string_count, node_count, text, graph_arrays, groups = marshal.loads(buffer)
+    strings = text.decode('utf-8', 'surrogatepass').split('\n') if string_count else []
+    if len(strings) != string_count:
+        raise ValueError("Bad cache snapshot.")
+    mappings = []
+    for (keys, offsets, members), build in zip(groups, (snapshot_list, snapshot_list, snapshot_fields)):
+        mappings.append(SnapshotGroups(strings, array('i', keys), array('i', offsets), array('i', members), build))
+
+    graph = None
+    kinds, offsets, targets = graph_arrays
+    if kinds and with_graph:
+        graph = netmodel.NetlistGraph.from_arrays(strings[:node_count], array('b', kinds), array('q', offsets), array('i', targets))
+    return mappings[0], mappings[1], mappings[2], graph
+
+
+def marshal_snapshot(data, graph=None):
+    """Return (nets, components, descriptions, graph arrays or None) for marshal, when pack_snapshot cannot store data."""
+    graph_arrays = None
+    if graph is not None and not graph.patch:
+        graph_arrays = (graph.names, graph.kinds.tobytes(), graph.offsets.tobytes(), graph.targets.tobytes())
+    return tuple(data) + (graph_arrays,)
+
+
+def unmarshal_snapshot(buffer, with_graph=False):
+    """Return (nets, components, descriptions, graph or None) from marshal_snapshot's bytes.
+
+    Snapshots marshalled before the graph was stored hold only the three dicts.
+    """
+    loaded = marshal.loads(buffer)
+    graph = None
+    if len(loaded) > 3 and loaded[3] and with_graph:
+        names, kinds, offsets, targets = loaded[3]
+        graph = netmodel.NetlistGraph.from_arrays(names, array('b', kinds), array('q', offsets), array('i', targets))
+    return loaded[0], loaded[1], loaded[2], graph
+
+
+def read_cache(key, cache_dir=None, with_graph=False):
+    """Return (nets, components, descriptions, graph or None) for key, or None on a miss."""
+    path = os.path.join(cache_dir or CACHE_DIR, key + '.bin')
+    try:
+        with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as snapshot:
+            magic = snapshot[:len(CACHE_MAGIC)]
+            body = memoryview(snapshot)[len(CACHE_MAGIC):]
+            try:
+                if magic == CACHE_MAGIC:
+                    data = unpack_snapshot(body, with_graph)
+                elif magic == CACHE_MAGIC_MARSHAL:
+                    data = unmarshal_snapshot(body, with_graph)
+                else:
+                    raise ValueError("Bad cache header.")
+            finally:
+                body.release()
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, EOFError, TypeError, IndexError, UnicodeDecodeError):
+        # Truncated or foreign file: drop it and parse again
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+    return data
+
+
+def write_cache(key, data, cache_dir=None, graph=None):
+    cache_dir = cache_dir or CACHE_DIR
+    packed = pack_snapshot(data, graph)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as file:
+            if packed is not None:
+                file.write(CACHE_MAGIC)
+                file.write(packed)
+            else:
+                file.write(CACHE_MAGIC_MARSHAL)
+                marshal.dump(marshal_snapshot(data, graph), file)
+        os.replace(tmp_path, os.path.join(cache_dir, key + '.bin'))
+        evict_cache(cache_dir)
+    except OSError:
+        # The cache is an optimisation only
+        pass
+
+
+def evict_cache(cache_dir=None, max_bytes=None):
+    """Remove the least recently used snapshots until the cache fits in max_bytes."""
+    cache_dir = cache_dir or CACHE_DIR
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith('.bin'):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def format_description(metadata):
+    """Return the display text for a component metadata entry, or None."""
+    if not metadata:
+        return None
+    if 'value' in metadata:
+        # Kicad: the value field, as shown in the component dropdowns
+        return metadata['value']
+    fields = [metadata.get('comment'), metadata.get('description')]
+    fields = [field for field in fields if field is not None]
+    return ' | '.join(fields) if fields else None
 
 
 def extract_description(file_content, designator):
-    # Detect file format
-    if "PROTEL" in file_content:
-        # Protel2 format
-        sections = file_content.split('[')
-        for section in sections:
-            if designator in section:
-                lines = section.split('\n')
-                comment, description = None, None
-                for i in range(len(lines)):
-                    if lines[i].strip() == 'Comment':
-                        comment = lines[i + 1].strip()
-                    if lines[i].strip() == 'DESCRIPTION':
-                        description = lines[i + 1].strip()
-                return comment + ' | ' + description
-    elif "EESchema" in file_content:
-        # Kicad format
-        for group in file_content.split('( /'):
-            line_group = group.split('\n')
-            for index, line in enumerate(line_group):
-                if index == 0:
-                    if not re.match(r'\s*\(', line):
-                        if designator == line.split(' ')[-2]:
-                            return line.split(' ')[-1]
-    return None
-
-
-def parse_protel2_netlist(file_content):
+    _, _, descriptions = load_data(file_content)
+    return format_description(descriptions.get(designator))
+
+
+def parse_protel2_netlist(lines):
+    if isinstance(lines, str):
+        lines = iter_lines(lines)
+    # The component blocks read their lines from the same iterator
+    lines = iter(lines)
     nets = {}
-    current_net = None
+    component_pins = {}
+    descriptions = {}
+    current_pins = None
     inside_net = False
-    lines = file_content.split('\n')
 
     for line in lines:
         line = line.strip()
-        if line.startswith('[') or line.endswith(']'):
+        if current_pins is not None and line and line[0] not in '[()' and line[-1] != ']':
+            # A pin line of the current net, most of the file
+            designator_pin = line.split(None, 1)[0]
+            current_pins.append(designator_pin)
+            component = designator_pin.partition('-')[0]
+            pins = component_pins.get(component)
+            if pins is None:
+                pins = component_pins[component] = []
+            pins.append(designator_pin)
+        elif line[:1] == '[':
+            # A component block up to ']': field names, each followed by its value
+            fields = {}
+            field_name = None
+            for line in lines:
+                line = line.strip()
+                if line[:1] == '[':
+                    fields = {}
+                    field_name = None
+                elif line[-1:] == ']':
+                    if 'DESIGNATOR' in fields:
+                        descriptions.setdefault(fields['DESIGNATOR'], {
+                            'comment': fields.get('Comment'),
+                            'description': fields.get('DESCRIPTION'),
+                        })
+                    break
+                elif field_name is not None:
+                    fields[field_name] = line
+                    field_name = None
+                elif line in PROTEL2_FIELDS:
+                    field_name = line
+        elif line[-1:] == ']':
             continue
         elif line == '(':
             inside_net = True
-            continue
-        elif inside_net and current_net is None:
-            current_net = line
-            nets[current_net] = []
+        elif inside_net and current_pins is None:
+            current_pins = nets[line] = []
         elif line == ')':
             inside_net = False
-            current_net = None
-        elif inside_net:
-            pin_info = line.split()
-            if len(pin_info) < 1:
-                continue
-            designator_pin = pin_info[0]
-            nets[current_net].append(designator_pin)
-
-    component_pins = {}
-
-    for net, connections in nets.items():
-        for connection in connections:
-            component, pin = connection.split('-')
-            if component not in component_pins:
-                component_pins[component] = []
-            component_pins[component].append(connection)
+            current_pins = None
+        elif inside_net and line:
+            designator_pin = line.split(None, 1)[0]
+            current_pins.append(designator_pin)
+            component = designator_pin.partition('-')[0]
+            pins = component_pins.get(component)
+            if pins is None:
+                pins = component_pins[component] = []
+            pins.append(designator_pin)
 
-    return component_pins, nets
+    return component_pins, nets, descriptions
 
 def create_component_pin_list_protel(nets):
     component_pins = {}
@@ -88,35 +555,168 @@ def create_component_pin_list_protel(nets):
             component_pins[component].append(connection)
     return component_pins
 
-import re
-def parse_kicad_netlist(file_content):
+def parse_kicad_netlist(lines):
+    if isinstance(lines, str):
+        lines = iter_lines(lines)
     component_pins = {}
     nets = {}
+    descriptions = {}
+    pins = None
+    designator = None
+
+    for line in lines:
+        line = line.strip()
+        if not line.startswith('('):
+            continue
+        if line.startswith('( /'):
+            # Component header: ( /uuid footprint  designator value
+            header = line[3:].split()
+            designator = header[-2]
+            pins = component_pins.get(designator)
+            if pins is None:
+                pins = component_pins[designator] = []
+            descriptions.setdefault(designator, {
+                'footprint': header[1] if len(header) > 3 else None,
+                'value': header[-1],
+            })
+        elif designator is not None and line.endswith(' )'):
+            # Pin line: ( pin net )
+            newline = line.split()
+            pin_designator = f"{designator}-{newline[-3]}"
+            pins.append(pin_designator)
+
+            net_pins = nets.get(newline[-2])
+            if net_pins is None:
+                net_pins = nets[newline[-2]] = []
+            net_pins.append(pin_designator)
+
+    return component_pins, nets, descriptions
+
+
+def sexpr_tokens(line):
+    """Return the tokens of one line as SEXPR_TOKEN matches them, and what to carry to the next.
+
+    Atoms keep their quotes; a string running past the end of the line is
+    left out of the tokens and carried over, to be joined with the next line.
+    """
+    tokens = SEXPR_TOKEN.findall(line)
+    if tokens:
+        last = tokens[-1][4]
+        if last and last[0] == '"' and not SEXPR_COMPLETE_STRING.fullmatch(last):
+            tokens.pop()
+            return tokens, line[line.rindex(last):]
+    return tokens, ''
+
+
+def sexpr_atom(token):
+    if token[0] == '"':
+        token = token[1:-1]
+        if '\\' in token:
+            token = SEXPR_ESCAPE.sub(r'\1', token)
+    return token
 
-    for group in file_content.split('( /'):
-        line_group = group.split('\n')
-        designator = None
 
-        for index, line in enumerate(line_group):
-            if index == 0:
-                if not re.match(r'\s*\(', line):
-                    designator = line.split(' ')[-2]
-                    if designator not in component_pins:
-                        component_pins[designator] = []
+def close_sexpr_list(stack, component_pins, nets, descriptions):
+    """Pop the innermost open list, use it if it is a node, net or comp, and return the new innermost."""
+    if len(stack) == 1:
+        raise ValueError("Unbalanced ')' in S-expression.")
+    head, atoms, fields, nodes = stack.pop()
+    frame = stack[-1]
+    if head == 'node':
+        # Split over several lines, or not in the usual field order
+        ref = fields.get('ref')
+        frame[3].append((ref, f"{ref}-{fields.get('pin')}"))
+    elif head == 'net':
+        net_pins = nets.get(fields.get('name'))
+        if net_pins is None:
+            net_pins = nets[fields.get('name')] = []
+        for ref, pin_designator in nodes:
+            net_pins.append(pin_designator)
+            pins = component_pins.get(ref)
+            if pins is None:
+                pins = component_pins[ref] = []
+            pins.append(pin_designator)
+    elif head == 'comp':
+        designator = fields.get('ref')
+        if designator not in component_pins:
+            component_pins[designator] = []
+        descriptions.setdefault(designator, {
+            'footprint': fields.get('footprint'),
+            'value': fields.get('value'),
+        })
+    elif atoms:
+        frame[2][head] = atoms[0]
+    return frame
+
+
+def parse_kicad_sexpr_netlist(lines):
+    """Parse a KiCad S-expression export, (export (version "E") ...).
+
+    Only comp (ref, value, footprint) and net (name, node ref/pin) are used,
+    so instead of building the tree the parser keeps a stack of the open
+    lists, each with its atoms, the first atom of every leaf list directly
+    inside it and the nodes collected so far. Lines SEXPR_LINE matches are
+    used whole; the others are split into tokens.
+    """
+    if isinstance(lines, str):
+        lines = iter_lines(lines)
+    component_pins = {}
+    nets = {}
+    descriptions = {}
+    # Open lists as [head, atoms, fields, nodes]
+    stack = [[None, [], {}, []]]
+    frame = stack[0]
+    carry = ''
+
+    for line in lines:
+        if carry:
+            line = carry + line
+        else:
+            match = SEXPR_LINE.match(line)
+            if match:
+                ref, pin, leaf, atom, closes = match.groups()
+                # Strings in such a line have no escapes, so they only lose their quotes
+                if ref is not None:
+                    if ref[0] == '"':
+                        ref = ref[1:-1]
+                    if pin[0] == '"':
+                        pin = pin[1:-1]
+                    frame[3].append((ref, f"{ref}-{pin}"))
+                elif leaf is not None:
+                    frame[2][leaf] = atom[1:-1] if atom[0] == '"' else atom
+                for _ in closes:
+                    frame = close_sexpr_list(stack, component_pins, nets, descriptions)
+                continue
+        tokens, carry = sexpr_tokens(line)
+        for ref, pin, leaf, atom, token in tokens:
+            if ref:
+                if ref[0] == '"':
+                    ref = sexpr_atom(ref)
+                if pin[0] == '"':
+                    pin = sexpr_atom(pin)
+                frame[3].append((ref, f"{ref}-{pin}"))
+            elif leaf:
+                frame[2][leaf] = sexpr_atom(atom) if atom[0] == '"' else atom
+            elif token == '(':
+                frame = [None, [], {}, []]
+                stack.append(frame)
+            elif token == ')':
+                frame = close_sexpr_list(stack, component_pins, nets, descriptions)
+            elif frame[0] is None:
+                frame[0] = token
             else:
-                if re.match(r'\s*\(', line) and line.endswith(' )'):
-                    newline = line.split(' ')
-                    pin = newline[-3]
-                    net = newline[-2]
-                    pin_designator = f"{designator}-{pin}"
-                    
-                    component_pins[designator].append(pin_designator)
-                    
-                    if net not in nets:
-                        nets[net] = []
-                    nets[net].append(pin_designator)
+                frame[1].append(sexpr_atom(token))
+
+    if carry:
+        raise ValueError("Unterminated string in S-expression.")
+    if len(stack) != 1:
+        raise ValueError("Unbalanced '(' in S-expression.")
+    return component_pins, nets, descriptions
 
-    return component_pins, nets
+
+register_parser('protel2', lambda header: "PROTEL" in header, parse_protel2_netlist)
+register_parser('kicad', lambda header: "EESchema" in header, parse_kicad_netlist)
+register_parser('kicad_sexpr', lambda header: header.lstrip().startswith('(export'), parse_kicad_sexpr_netlist)
 
 
 def main():
@@ -139,6 +739,10 @@ def main():
     parser_protel2 = subparsers.add_parser("parse_kicad_netlist", help="Parse Protel2 netlist")
     parser_protel2.add_argument("file_path", type=str, help="Path to the file")
 
+    # Subcommand for parse_kicad_sexpr_netlist
+    parser_sexpr = subparsers.add_parser("parse_kicad_sexpr_netlist", help="Parse Kicad S-expression netlist")
+    parser_sexpr.add_argument("file_path", type=str, help="Path to the file")
+
     # Parse arguments
     args = parser.parse_args()
 
@@ -159,14 +763,20 @@ def main():
             print(f"No description found for designator {args.designator}")
     
     elif args.function == "parse_protel2_netlist":
-        components,nets = parse_protel2_netlist(file_content)
+        components,nets,_ = parse_protel2_netlist(file_content)
         print("Component Pin List:", components)
         print(" ")
         print("Parsed kicad Nets:", nets)
     
 
     elif args.function == "parse_kicad_netlist":
-        components,nets = parse_kicad_netlist(file_content)
+        components,nets,_ = parse_kicad_netlist(file_content)
+        print("Component Pin List:", components)
+        print(" ")
+        print("Parsed kicad Nets:", nets)
+
+    elif args.function == "parse_kicad_sexpr_netlist":
+        components,nets,_ = parse_kicad_sexpr_netlist(file_content)
         print("Component Pin List:", components)
         print(" ")
         print("Parsed kicad Nets:", nets)
@@ -0,0 +1,228 @@
+'''
+Level-of-detail view of large result subgraphs.
+
+Drawing every pin, net and component of a big neighbourhood gives vis-network
+more nodes than it can lay out. plan_lod keeps the source, the target and the
+found paths in full detail, draws every other component with its pins folded
+in, and hides what lies further out than the node budget allows behind one
+cluster node per node it hangs off. The page keeps the hidden nodes and all
+the edges, so a double-click on a cluster or a folded component expands it in
+place (render.write_lod_html).
+'''
+import netmodel
+
+# Nodes drawn at most, unless the source, target and paths alone need more
+NODE_BUDGET = 1500
+
+CLUSTER_PREFIX = 'cluster:'
+
+
+class LodPlan:
+    """What to draw of a subgraph.
+
+    owner maps every hidden node id, and every hidden cluster name, to what
+    stands in for it: a component id for a folded pin, or a cluster name.
+    Clusters nest, so expanding one shows a single level more. clusters maps
+    a cluster name to the node id it hangs off (None for parts not connected
+    to the focus), the ids of its direct members and its node counts per
+    kind, nested clusters included.
+    """
+
+    def __init__(self):
+        self.owner = {}
+        self.folded = {}
+        self.clusters = {}
+
+
+def fold_pins(graph, subgraph, focus):
+    """Return {component id: pin ids} for the components drawn without their pins.
+
+    Components on the focus, or with a pin on it, keep their pins.
+    """
+    kinds = graph.kinds
+    component_of = {}
+    for node in subgraph:
+        if kinds[node] == netmodel.PIN:
+            for neighbor in graph.neighbors(node):
+                if kinds[neighbor] == netmodel.COMPONENT and neighbor in subgraph:
+                    component_of[node] = neighbor
+                    break
+    expanded = {node for node in focus if kinds[node] == netmodel.COMPONENT}
+    expanded.update(component_of[node] for node in focus if node in component_of)
+    folded = {}
+    for pin, component in component_of.items():
+        if component not in expanded:
+            folded.setdefault(component, []).append(pin)
+    return folded
+
+
+def plan_lod(graph, subgraph, focus, budget=NODE_BUDGET):
+    """Return the LodPlan drawing subgraph in about budget nodes.
+
+    Units (nets, pins left unfolded, components with their folded pins) are
+    ranked by BFS distance from the focus inside the subgraph. Every level
+    that fits the budget is drawn, counting one cluster per unit that has
+    units beyond it, and what budget is left opens the next level where it
+    can, in part where a whole anchor does not fit. Each unit not drawn joins
+    the cluster of its BFS parent.
+    """
+    lod = LodPlan()
+    lod.folded = fold_pins(graph, subgraph, focus)
+    for component, pins in lod.folded.items():
+        for pin in pins:
+            lod.owner[pin] = component
+
+    def unit_neighbors(unit):
+        for member in [unit] + lod.folded.get(unit, []):
+            for neighbor in graph.neighbors(member):
+                if neighbor in subgraph:
+                    neighbor = lod.owner.get(neighbor, neighbor)
+                    if neighbor != unit:
+                        yield neighbor
+
+    # Multi-source BFS over units, first parent wins
+    roots = list(dict.fromkeys(lod.owner.get(node, node) for node in focus if node in subgraph))
+    parent = dict.fromkeys(roots)
+    levels = [roots]
+    has_children = set()
+    while levels[-1]:
+        next_level = []
+        for unit in levels[-1]:
+            for neighbor in unit_neighbors(unit):
+                if neighbor not in parent:
+                    parent[neighbor] = unit
+                    has_children.add(unit)
+                    next_level.append(neighbor)
+        levels.append(next_level)
+    levels.pop()
+
+    # Deepest level whose units plus one cluster per unit with children fit; the focus is always drawn
+    cut = 0
+    drawn = 0
+    for depth, level in enumerate(levels):
+        anchors = sum(1 for unit in level if unit in has_children)
+        if depth > 0 and drawn + len(level) + anchors > budget:
+            break
+        drawn += len(level)
+        cut = depth
+    shown = set()
+    for level in levels[:cut + 1]:
+        shown.update(level)
+
+    # The rest of the budget opens the next level one anchor at a time, focus side first
+    room = budget - drawn - sum(1 for unit in levels[cut] if unit in has_children)
+    if cut + 1 < len(levels):
+        below = {}
+        for unit in levels[cut + 1]:
+            below.setdefault(parent[unit], []).append(unit)
+        too_big = []
+        for anchor, units in below.items():
+            # The anchor's cluster gives way to its units and their own clusters
+            cost = len(units) + sum(1 for unit in units if unit in has_children) - 1
+            if cost <= room:
+                shown.update(units)
+                room -= cost
+            else:
+                too_big.append(units)
+
+        # Anchors that do not fit open in part, the units leading to the most
+        # hidden nodes first; the anchor's cluster keeps the rest
+        if too_big and room > 0:
+            descendants = {}
+            for level in reversed(levels[1:]):
+                for unit in level:
+                    descendants[parent[unit]] = descendants.get(parent[unit], 0) + descendants.get(unit, 0) + 1
+            for units in too_big:
+                for unit in sorted(units, key=lambda unit: descendants.get(unit, 0), reverse=True):
+                    cost = 2 if unit in has_children else 1
+                    if cost <= room:
+                        shown.add(unit)
+                        room -= cost
+                if room <= 0:
+                    break
+
+    # Past that every unit joins the cluster of its BFS parent, and a
+    # parent's cluster is hidden wherever the parent itself is
+    names = graph.names
+    beyond = [unit for level in levels[cut + 1:] for unit in level if unit not in shown]
+    for unit in beyond:
+        above = parent[unit]
+        cluster = CLUSTER_PREFIX + names[above]
+        if cluster not in lod.clusters:
+            lod.clusters[cluster] = (above, [], [0, 0, 0])
+            if above in lod.owner:
+                lod.owner[cluster] = lod.owner[above]
+        lod.owner[unit] = cluster
+        lod.clusters[cluster][1].append(unit)
+
+    # Counts from the deepest clusters up
+    for unit in reversed(beyond):
+        counts = lod.clusters[lod.owner[unit]][2]
+        counts[graph.kinds[unit]] += 1
+        counts[netmodel.PIN] += len(lod.folded.get(unit, ()))
+        nested = lod.clusters.get(CLUSTER_PREFIX + names[unit])
+        if nested is not None:
+            for kind in range(3):
+                counts[kind] += nested[2][kind]
+
+    # Units with no connection to the focus inside the subgraph
+    stray = [node for node in subgraph if node not in lod.owner and node not in parent]
+    if stray:
+        counts = [0, 0, 0]
+        for unit in stray:
+            lod.owner[unit] = CLUSTER_PREFIX + 'unconnected'
+            counts[graph.kinds[unit]] += 1
+            counts[netmodel.PIN] += len(lod.folded.get(unit, ()))
+        lod.clusters[CLUSTER_PREFIX + 'unconnected'] = (None, stray, counts)
+    return lod
+
+
+def cluster_node(graph, lod, cluster):
+    """vis node dict of a cluster, counting everything hidden inside it."""
+    anchor, _, counts = lod.clusters[cluster]
+    total = sum(counts)
+    where = f"beyond {graph.names[anchor]}" if anchor is not None else "not connected to the source"
+    return {
+        'id': cluster,
+        'label': f"+{total}",
+        'color': 'lightgray',
+        'shape': 'hexagon',
+        'title': f"{total} nodes {where}: {counts[netmodel.PIN]} pins, {counts[netmodel.NET]} nets, "
+                 f"{counts[netmodel.COMPONENT]} components. Double-click to expand.",
+    }
+
+
+def lod_elements(graph, lod, nodes, counters=None):
+    """Split the vis node dicts of the whole subgraph into drawn and hidden ones.
+
+    Returns (drawn node dicts, {name: hidden node dict}, {name: owner name},
+    {name: plain node dict}). Folded components are drawn and hidden with a
+    pin count; the last dict keeps their plain form for when they are expanded.
+    """
+    index = graph.index
+    drawn = []
+    hidden = {}
+    expanded = {}
+    for node in nodes:
+        node_id = index[node['id']]
+        if node_id in lod.folded:
+            expanded[node['id']] = node
+            node = dict(node, label=f"{node['label']} (+{len(lod.folded[node_id])} pins)",
+                        title=f"{node['title'] or node['id']}\nDouble-click to show its pins.")
+        if node_id in lod.owner:
+            hidden[node['id']] = node
+        else:
+            drawn.append(node)
+    for cluster in lod.clusters:
+        node = cluster_node(graph, lod, cluster)
+        if cluster in lod.owner:
+            hidden[cluster] = node
+        else:
+            drawn.append(node)
+    names = graph.names
+    # Node ids become names; cluster names already are
+    owner = {key if isinstance(key, str) else names[key]: value if isinstance(value, str) else names[value]
+             for key, value in lod.owner.items()}
+    if counters is not None:
+        counters.update(drawn=len(drawn), hidden=len(hidden), clusters=len(lod.clusters), folded=len(lod.folded))
+    return drawn, hidden, owner, expanded
@@ -0,0 +1,137 @@
+'''
+Connectivity diff between two revisions of a parsed netlist.
+
+    python netdiff.py rev_a.NET rev_b.NET
+
+Nets and components are compared through their canonical form, the frozenset
+of their pins, so unchanged groups cost one hash lookup and the whole diff is
+linear in the size of the two netlists. The result can be applied to a graph
+built from the first revision with NetlistGraph.apply_diff.
+'''
+import argparse
+
+import loader
+
+
+class NetlistDiff:
+    """What changed between two revisions.
+
+    Added and removed names are sets. Edges are lists of (pin, group) pairs,
+    which is what NetlistGraph.apply_diff needs. moved_pins maps a pin present
+    in both revisions to its (old net, new net), and renamed_nets maps an old
+    net name to the new name of a net with exactly the same pins.
+    """
+
+    def __init__(self):
+        self.added_pins = set()
+        self.removed_pins = set()
+        self.added_nets = set()
+        self.removed_nets = set()
+        self.added_components = set()
+        self.removed_components = set()
+        self.added_net_edges = []
+        self.removed_net_edges = []
+        self.added_component_edges = []
+        self.removed_component_edges = []
+        self.moved_pins = {}
+        self.renamed_nets = {}
+
+    def __bool__(self):
+        return bool(self.added_net_edges or self.removed_net_edges or self.added_component_edges
+                    or self.removed_component_edges or self.added_nets or self.removed_nets
+                    or self.added_components or self.removed_components)
+
+    def removed_names(self):
+        return self.removed_pins | self.removed_nets | self.removed_components
+
+    def summary_lines(self):
+        lines = [
+            f"Pins: +{len(self.added_pins)} -{len(self.removed_pins)}, moved {len(self.moved_pins)}",
+            f"Nets: +{len(self.added_nets)} -{len(self.removed_nets)}, renamed {len(self.renamed_nets)}",
+            f"Components: +{len(self.added_components)} -{len(self.removed_components)}",
+        ]
+        for old, new in sorted(self.renamed_nets.items()):
+            lines.append(f"  net {old} -> {new}")
+        for pin, (old, new) in sorted(self.moved_pins.items()):
+            lines.append(f"  pin {pin}: {old} -> {new}")
+        return lines
+
+
+def canonical_forms(groups):
+    """Return {name: frozenset of pins} for a nets or components dict."""
+    return {name: frozenset(pins) for name, pins in groups.items()}
+
+
+def group_edges(old_groups, new_groups, old_forms, new_forms):
+    """Return the (pin, group) edges added and removed between two revisions of one group dict."""
+    added = []
+    removed = []
+    for name, form in old_forms.items():
+        new_form = new_forms.get(name)
+        if new_form is None:
+            removed.extend((pin, name) for pin in dict.fromkeys(old_groups[name]))
+        elif new_form != form:
+            removed.extend((pin, name) for pin in dict.fromkeys(old_groups[name]) if pin not in new_form)
+            added.extend((pin, name) for pin in dict.fromkeys(new_groups[name]) if pin not in form)
+    for name, pins in new_groups.items():
+        if name not in old_forms:
+            added.extend((pin, name) for pin in dict.fromkeys(pins))
+    return added, removed
+
+
+def all_pins(nets, components):
+    pins = set()
+    for groups in (nets, components):
+        for group_pins in groups.values():
+            pins.update(group_pins)
+    return pins
+
+
+def diff_netlists(old_nets, old_components, new_nets, new_components):
+    """Return the NetlistDiff taking the first revision to the second."""
+    diff = NetlistDiff()
+    old_net_forms, new_net_forms = canonical_forms(old_nets), canonical_forms(new_nets)
+    old_component_forms, new_component_forms = canonical_forms(old_components), canonical_forms(new_components)
+
+    diff.added_nets = new_net_forms.keys() - old_net_forms.keys()
+    diff.removed_nets = old_net_forms.keys() - new_net_forms.keys()
+    diff.added_components = new_component_forms.keys() - old_component_forms.keys()
+    diff.removed_components = old_component_forms.keys() - new_component_forms.keys()
+
+    old_pins, new_pins = all_pins(old_nets, old_components), all_pins(new_nets, new_components)
+    diff.added_pins = new_pins - old_pins
+    diff.removed_pins = old_pins - new_pins
+
+    diff.added_net_edges, diff.removed_net_edges = group_edges(old_nets, new_nets, old_net_forms, new_net_forms)
+    diff.added_component_edges, diff.removed_component_edges = group_edges(
+        old_components, new_components, old_component_forms, new_component_forms)
+
+    # A removed net whose pins reappear unchanged under a new name was renamed
+    added_by_form = {new_net_forms[name]: name for name in diff.added_nets}
+    for name in diff.removed_nets:
+        new_name = added_by_form.get(old_net_forms[name])
+        if new_name is not None:
+            diff.renamed_nets[name] = new_name
+
+    old_net_of = {pin: net for pin, net in diff.removed_net_edges}
+    for pin, net in diff.added_net_edges:
+        old_net = old_net_of.get(pin)
+        if old_net is not None and diff.renamed_nets.get(old_net) != net:
+            diff.moved_pins[pin] = (old_net, net)
+    return diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the connectivity changes between two netlist revisions")
+    parser.add_argument("old_file", type=str, help="Netlist of the earlier revision")
+    parser.add_argument("new_file", type=str, help="Netlist of the later revision")
+    args = parser.parse_args()
+
+    old_nets, old_components, _ = loader.load_file(args.old_file)
+    new_nets, new_components, _ = loader.load_file(args.new_file)
+    for line in diff_netlists(old_nets, old_components, new_nets, new_components).summary_lines():
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,61 +1,240 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import re
+import bisect
+import os
+import queue
+import threading
+import time
 import loader
 import graph
-
-def load_file():
-    file_path = filedialog.askopenfilename(filetypes=[("Netlist Files", "*.NET")])
-    if not file_path:
-        return None, None, None
-    with open(file_path, "r") as file:
-        file_content = file.read()
-    nets,components=loader.load_data(file_content)
-    return file_content, nets, components
+import component_search
+import instrument
+import lod
+import query_cache
+import rails
+import watch
+
+# Results of earlier Execute runs on the loaded netlist
+session_cache = query_cache.QueryCache()
+# Search index over the components of the loaded netlist
+component_index = None
+# FileWatcher of the loaded netlist, for watch mode
+watcher = None
+
+def load_file(file_path, digest=None):
+    nets,components,descriptions,netlist_graph=loader.load_file(file_path, digest=digest, with_graph=True)
+    return descriptions, nets, components, netlist_graph
 
 def list_components(components):
     return list(components.keys())
 
-def list_pins(components, component):
-    if component in components:
-        return [pin.split('-')[1] for pin in components[component]]
-    return []
-
 def validate_component_pin(components, component_pin):
     return component_pin in list_components(components)
 
-def apply_filter(lista, filter):
+def filter_pattern(filter):
+    """Return the substring a filter matches, or None when it matches everything."""
     filter = filter.strip()
     if filter.startswith('*'):
         filter = filter[1:]
     if filter.endswith('*'):
         filter = filter[:-1]
-    if '*' in filter:
-        return lista 
-    return [item for item in lista if filter in item]
-
-def refresh_blacklist(filter, original_list, frame, vars_dict):
-    estado_atual = {item: var.get() for item, var in vars_dict.items()}
-
-    for widget in frame.winfo_children():
-        widget.destroy()
-
-    lista_filtrada = apply_filter(original_list, filter.get())
-    
-    for item in lista_filtrada:
-        var = tk.BooleanVar(value=estado_atual.get(item, False))
-        chk = tk.Checkbutton(frame, text=item, variable=var)
-        chk.pack(anchor='w')
-        vars_dict[item] = var
-
-def clean_blacklists(frame_nets, frame_components, vars_nets, vars_components):
-    for widget in frame_nets.winfo_children():
-        widget.destroy()
-    for widget in frame_components.winfo_children():
-        widget.destroy()
-
-    vars_nets.clear()
-    vars_components.clear()
+    if '*' in filter or not filter:
+        return None
+    return filter
+
+class FilterIndex:
+    """Substring search over a fixed list, done by str.find on one joined string."""
+
+    def __init__(self, items):
+        self.items = list(items)
+        self.text = '\n'.join(self.items)
+        self.starts = []
+        position = 0
+        for item in self.items:
+            self.starts.append(position)
+            position += len(item) + 1
+
+    def search(self, filter):
+        pattern = filter_pattern(filter)
+        if pattern is None:
+            return self.items
+        found = []
+        text, starts = self.text, self.starts
+        position = text.find(pattern)
+        while position != -1:
+            row = bisect.bisect_right(starts, position) - 1
+            found.append(self.items[row])
+            # Continue after the end of the matching row
+            next_row = starts[row + 1] if row + 1 < len(starts) else len(text)
+            position = text.find(pattern, next_row)
+        return found
+
+class CheckList(tk.Frame):
+    """Scrollable check list that only draws the rows in view.
+
+    Checked items are kept in the plain set ``checked`` and survive filtering.
+    """
+    row_height = 20
+    filter_delay = 150
+
+    def __init__(self, master, **kwargs):
+        super().__init__(master, **kwargs)
+        self.index = FilterIndex([])
+        self.rows = []
+        self.checked = set()
+        self.top = 0
+        self.pending_filter = None
+
+        self.canvas = tk.Canvas(self, highlightthickness=0, background='white')
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self.canvas.bind("<Configure>", lambda e: self.redraw())
+        self.canvas.bind("<Button-1>", self.toggle)
+        self.canvas.bind("<MouseWheel>", lambda e: self.yview('scroll', -1 if e.delta > 0 else 1, 'units'))
+        self.canvas.bind("<Button-4>", lambda e: self.yview('scroll', -1, 'units'))
+        self.canvas.bind("<Button-5>", lambda e: self.yview('scroll', 1, 'units'))
+
+    def set_items(self, items):
+        self.index = FilterIndex(items)
+        self.rows = self.index.items
+        self.checked.clear()
+        self.top = 0
+        self.redraw()
+
+    def checked_items(self):
+        return [item for item in self.index.items if item in self.checked]
+
+    def schedule_filter(self, filter):
+        """Filter after the user stops typing for filter_delay ms."""
+        if self.pending_filter is not None:
+            self.after_cancel(self.pending_filter)
+        self.pending_filter = self.after(self.filter_delay, self.apply_filter, filter)
+
+    def apply_filter(self, filter):
+        self.pending_filter = None
+        self.rows = self.index.search(filter)
+        self.top = 0
+        self.redraw()
+
+    def visible_rows(self):
+        return max(1, self.canvas.winfo_height() // self.row_height)
+
+    def yview(self, *args):
+        visible = self.visible_rows()
+        last_top = max(0, len(self.rows) - visible)
+        if args[0] == 'moveto':
+            self.top = int(float(args[1]) * len(self.rows))
+        elif args[0] == 'scroll':
+            step = visible if args[2] == 'pages' else 1
+            self.top += int(args[1]) * step
+        self.top = min(max(self.top, 0), last_top)
+        self.redraw()
+
+    def redraw(self):
+        canvas = self.canvas
+        canvas.delete('all')
+        visible = self.visible_rows()
+        for offset, item in enumerate(self.rows[self.top:self.top + visible + 1]):
+            y = offset * self.row_height
+            canvas.create_rectangle(4, y + 4, 16, y + 16, outline='black')
+            if item in self.checked:
+                canvas.create_rectangle(7, y + 7, 13, y + 13, fill='black')
+            canvas.create_text(22, y + self.row_height // 2, text=item, anchor='w')
+        if self.rows:
+            self.scrollbar.set(self.top / len(self.rows), min(1.0, (self.top + visible) / len(self.rows)))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def toggle(self, event):
+        row = self.top + event.y // self.row_height
+        if 0 <= row < len(self.rows):
+            item = self.rows[row]
+            if item in self.checked:
+                self.checked.discard(item)
+            else:
+                self.checked.add(item)
+            self.redraw()
+
+class BackgroundTask:
+    """Runs one job at a time on a worker thread.
+
+    The job is called as work(cancel, progress) with a threading.Event and a
+    progress(text) callback. Progress, the result and errors come back through
+    a queue polled with root.after, so widgets are only touched from the Tk
+    thread and only once the result is ready.
+    """
+    POLL_MS = 50
+
+    def __init__(self, root, status_var):
+        self.root = root
+        self.status_var = status_var
+        self.queue = queue.Queue()
+        self.cancel_event = None
+        self.on_done = None
+        self.busy_widgets = []
+        self.cancel_button = None
+
+    def running(self):
+        return self.cancel_event is not None
+
+    def set_busy(self, busy):
+        for widget in self.busy_widgets:
+            widget.config(state=tk.DISABLED if busy else tk.NORMAL)
+        if self.cancel_button is not None:
+            self.cancel_button.config(state=tk.NORMAL if busy else tk.DISABLED)
+
+    def start(self, name, work, on_done):
+        if self.running():
+            return
+        cancel = self.cancel_event = threading.Event()
+        self.on_done = on_done
+        self.set_busy(True)
+        self.status_var.set(f"{name}...")
+
+        def run():
+            try:
+                result = work(cancel, lambda text: self.queue.put(('progress', text)))
+                self.queue.put(('done', result))
+            except graph.Cancelled:
+                self.queue.put(('cancelled', None))
+            except Exception as error:
+                self.queue.put(('error', error))
+
+        threading.Thread(target=run, daemon=True).start()
+        self.root.after(self.POLL_MS, self.poll)
+
+    def cancel(self):
+        if self.running():
+            self.cancel_event.set()
+            self.status_var.set("Cancelling...")
+
+    def poll(self):
+        while True:
+            try:
+                kind, value = self.queue.get_nowait()
+            except queue.Empty:
+                self.root.after(self.POLL_MS, self.poll)
+                return
+            if kind == 'progress':
+                if not self.cancel_event.is_set():
+                    self.status_var.set(value)
+                continue
+
+            cancelled = self.cancel_event.is_set()
+            self.cancel_event = None
+            self.set_busy(False)
+            if kind == 'error':
+                self.status_var.set("Failed.")
+                messagebox.showerror("Error", f"{type(value).__name__}: {value}")
+            elif kind == 'cancelled' or cancelled:
+                # A load can only stop between steps; drop what it finished
+                self.status_var.set("Cancelled.")
+            else:
+                self.status_var.set("Done.")
+                self.on_done(value)
+            return
 
 def string_length_to_pixels(string_length, font):
     root = tk.Tk()
@@ -65,75 +244,122 @@ def string_length_to_pixels(string_length, font):
     root.destroy()
     return bbox[2] - bbox[0]
     
-def select_component(event, component_var, components_with_description, update_pins):
-    typed_component = component_var.get().split(' ')
-    for item in components_with_description:
-        if item.startswith(typed_component[0]):
-            component_var.set(item)
+def select_component(event, component_var, update_pins=None):
+    label = component_index.resolve(component_var.get()) if component_index else None
+    if label is not None:
+        component_var.set(label)
+        if update_pins is not None:
             update_pins()
-            break
-
-def select_component_NOPIN(event, component_var, components_with_description):
-    typed_component = component_var.get().split(' ')
-    for item in components_with_description:
-        if item.startswith(typed_component[0]):
-            component_var.set(item)
-            break
-
-def split_letters_numbers(text):
-    partes = re.findall(r'\D+|\d+', text)
-    return [int(parte) if parte.isdigit() else parte for parte in partes]
 
-def sort_letters_numbers(lista):
-    return sorted(lista, key=split_letters_numbers)
+def filter_components(event, dropdown, component_var):
+    # Navigation keys move through the list; only edits refilter it
+    if component_index is None or event.keysym in ('Return', 'Up', 'Down', 'Escape', 'Tab'):
+        return
+    dropdown['values'] = component_index.search(component_var.get())
 
 def start_interface():
     def load_file_callback(file_content_var):
-        global components, nets, file_content, components_list, sorted_nets, components_with_description
-        file_content, nets, components = load_file()
-        if file_content is None:
+        file_path = filedialog.askopenfilename(filetypes=[("Netlist Files", "*.NET")])
+        if not file_path:
             messagebox.showerror("Error", "No file loaded.")
             return
+
+        def work(cancel, progress):
+            progress("Parsing netlist and building graph...")
+            file_watcher = watch.FileWatcher(file_path)
+            descriptions, nets, components, netlist_graph = load_file(file_path, file_watcher.digest)
+            graph.check_cancelled(cancel)
+            progress("Indexing components...")
+            return descriptions, nets, components, netlist_graph, component_search.ComponentIndex(components, descriptions), file_watcher
+
+        task.start("Loading", work, lambda result: file_loaded(file_content_var, *result))
+
+    def file_loaded(file_content_var, loaded_descriptions, loaded_nets, loaded_components, loaded_graph, loaded_index, loaded_watcher):
+        global components, nets, descriptions, netlist_graph, component_index, watcher
+        descriptions, nets, components, netlist_graph = loaded_descriptions, loaded_nets, loaded_components, loaded_graph
+        component_index, watcher = loaded_index, loaded_watcher
+        session_cache.clear()
+        page_opened[0] = False
         file_content_var.set("File loaded!")
         component_var.set('')
-        
-        clean_blacklists(scrollable_frame_nets, scrollable_frame_components, blacklist_nets_vars, blacklist_components_vars)
-        
-        components_list = list_components(components)
-        components_list = sort_letters_numbers(components_list)
-        components_with_description = [f"{comp} ({loader.extract_description(file_content, comp)})" for comp in components_list]
+        show_netlist(keep_checked=False)
+
+    def show_netlist(keep_checked):
+        """Fill the dropdowns and blacklists from the loaded netlist, keeping the selections on a reload."""
+        global components_list, sorted_nets, components_with_description
+        components_list = component_index.names
+        components_with_description = component_index.labels
         max_length = max(len(comp) for comp in components_with_description)
         components_dropdown.config(width=max_length)
-        components_dropdown['values'] = components_with_description
+        components_dropdown['values'] = component_index.search('')
 
         components_target_dropdown.config(width=max_length)
-        components_target_dropdown['values'] = components_with_description
-
-        def update_pins(*args):
-            components_selecionado = component_var.get().split(' ')
-            pins_list = list_pins(components, components_selecionado[0])
-            pins_list = sort_letters_numbers(pins_list)
-            pin_dropdown['values'] = pins_list
-            pin_var.set('')
-
-        component_var.trace_add("write", update_pins)
-        components_dropdown.bind("<Return>", lambda event: select_component(event, component_var, components_with_description, update_pins))
-
-        components_target_dropdown.bind("<Return>", lambda event: select_component_NOPIN(event, components_target_var, components_with_description))
+        components_target_dropdown['values'] = component_index.search('')
+        # Setting the variables would clear the picked pins
+        pin_dropdown['values'] = component_index.pins(component_var.get().split(' ')[0])
+        pin_target_dropdown['values'] = component_index.pins(components_target_var.get().split(' ')[0])
 
         sorted_nets = sorted(nets.keys(), key=lambda net: len(nets[net]), reverse=True)
 
-        refresh_blacklist(filter_nets_var, sorted_nets, scrollable_frame_nets, blacklist_nets_vars)
-        refresh_blacklist(filter_components_var, components_list, scrollable_frame_components, blacklist_components_vars)
+        for checklist, items, filter_var in ((blacklist_nets_list, sorted_nets, filter_nets_var),
+                                             (blacklist_components_list, components_list, filter_components_blacklist_var)):
+            checked = checklist.checked.intersection(items) if keep_checked else set()
+            checklist.set_items(items)
+            checklist.checked.update(checked)
+            checklist.apply_filter(filter_var.get())
+        update_rails()
+
+    def poll_watch():
+        root.after(int(watch.POLL_SECONDS * 1000), poll_watch)
+        if not watch_var.get() or watcher is None or task.running() or not watcher.settled_change():
+            return
+        file_watcher = watcher
+        old_descriptions = descriptions
+
+        def work(cancel, progress):
+            progress("Checking netlist...")
+            digest = file_watcher.new_digest()
+            if digest is None:
+                return None
+            progress("Reloading netlist...")
+            loaded = watch.reload_netlist(file_watcher.file_path, digest, nets, components, cancel)
+            # Comparing loads every description of a snapshot, so not on the Tk thread
+            descriptions_changed = not loaded[3] and loaded[2] != old_descriptions
+            progress("Indexing components...")
+            return (digest, *loaded, descriptions_changed, component_search.ComponentIndex(loaded[1], loaded[2]))
+
+        task.start("Watching", work, lambda result: file_reloaded(file_watcher, result))
+
+    def file_reloaded(file_watcher, result):
+        global components, nets, descriptions, component_index
+        if result is None or file_watcher is not watcher:
+            # Same content, or another file was loaded meanwhile
+            return
+        file_watcher.digest, nets, components, descriptions, diff, descriptions_changed, component_index = result
+        if diff:
+            # On the Tk thread, so a cancelled reload never leaves the graph half updated
+            netlist_graph.apply_diff(diff)
+        elif descriptions_changed:
+            # Same graph version, but cached pages show the old values and footprints
+            session_cache.clear()
+        file_content_var.set(f"Reloaded at {time.strftime('%H:%M:%S')}" + ("" if diff else " (no connectivity change)"))
+        for line in diff.summary_lines():
+            print(line)
+        show_netlist(keep_checked=True)
+        if page_opened[0]:
+            execute_graphs()
 
     root = tk.Tk()
     root.title("Netlist configuration")
+    status_var = tk.StringVar()
+    task = BackgroundTask(root, status_var)
     file_frame = tk.Frame(root)
     file_frame.pack(pady=5)
 
     tk.Label(file_frame, text="Select the netlist file:").grid(row=0, column=0)
     file_content_var = tk.StringVar()
-    tk.Button(file_frame, text="Load file", command=lambda: load_file_callback(file_content_var)).grid(row=0, column=1, padx=5)
+    load_button = tk.Button(file_frame, text="Load file", command=lambda: load_file_callback(file_content_var))
+    load_button.grid(row=0, column=1, padx=5)
     tk.Label(file_frame, textvariable=file_content_var).grid(row=0, column=2, padx=5)
 
     filter_components_var = tk.StringVar()
@@ -148,6 +374,15 @@ def start_interface():
     pin_dropdown = ttk.Combobox(root, textvariable=pin_var)
     pin_dropdown.pack(pady=5)
 
+    def update_pins(*args):
+        component = component_var.get().split(' ')[0]
+        pin_dropdown['values'] = component_index.pins(component) if component_index else []
+        pin_var.set('')
+
+    component_var.trace_add("write", update_pins)
+    components_dropdown.bind("<Return>", lambda event: select_component(event, component_var, update_pins))
+    components_dropdown.bind("<KeyRelease>", lambda event: filter_components(event, components_dropdown, component_var))
+
     tk.Label(root, text="Component Target:").pack(pady=5)
     components_target_var = tk.StringVar()
     components_target_dropdown = ttk.Combobox(root, textvariable=components_target_var)
@@ -160,13 +395,12 @@ def start_interface():
 
     def update_target_pins(*args):
         component_target = components_target_var.get().split(' ')[0]
-        pins_target_list = list_pins(components, component_target)
-        pins_target_list = sort_letters_numbers(pins_target_list)
-        pin_target_dropdown['values'] = pins_target_list
+        pin_target_dropdown['values'] = component_index.pins(component_target) if component_index else []
         pin_target_var.set('')
 
     components_target_var.trace_add("write", update_target_pins)
-    components_target_dropdown.bind("<Return>", lambda event: select_component_NOPIN(event, components_target_var, components_with_description))
+    components_target_dropdown.bind("<Return>", lambda event: select_component(event, components_target_var))
+    components_target_dropdown.bind("<KeyRelease>", lambda event: filter_components(event, components_target_dropdown, components_target_var))
 
     depth_num_path_frame = tk.Frame(root)
     depth_num_path_frame.pack(pady=5)
@@ -194,33 +428,14 @@ def start_interface():
     filter_components_blacklist_entry = tk.Entry(blacklist_frame, textvariable=filter_components_blacklist_var)
     filter_components_blacklist_entry.grid(row=1, column=1)
 
-    nets_frame = tk.Frame(blacklist_frame)
-    nets_frame.grid(row=2, column=0, sticky='nsew')
-    canvas_nets = tk.Canvas(nets_frame)
-    scrollbar_nets = tk.Scrollbar(nets_frame, orient="vertical", command=canvas_nets.yview)
-    scrollable_frame_nets = tk.Frame(canvas_nets)
-    scrollable_frame_nets.bind("<Configure>", lambda e: canvas_nets.configure(scrollregion=canvas_nets.bbox("all")))
-    canvas_nets.create_window((0, 0), window=scrollable_frame_nets, anchor="nw")
-    canvas_nets.configure(yscrollcommand=scrollbar_nets.set)
-    scrollbar_nets.pack(side="right", fill="y")
-    canvas_nets.pack(side="left", fill="both", expand=True)
-
-    components_frame = tk.Frame(blacklist_frame)
-    components_frame.grid(row=2, column=1, sticky='nsew')
-    canvas_components = tk.Canvas(components_frame)
-    scrollbar_components = tk.Scrollbar(components_frame, orient="vertical", command=canvas_components.yview)
-    scrollable_frame_components = tk.Frame(canvas_components)
-    scrollable_frame_components.bind("<Configure>", lambda e: canvas_components.configure(scrollregion=canvas_components.bbox("all")))
-    canvas_components.create_window((0, 0), window=scrollable_frame_components, anchor="nw")
-    canvas_components.configure(yscrollcommand=scrollbar_components.set)
-    scrollbar_components.pack(side="right", fill="y")
-    canvas_components.pack(side="left", fill="both", expand=True)
-
-    blacklist_nets_vars = {}
-    blacklist_components_vars = {}
-
-    filter_nets_var.trace_add("write", lambda *args: refresh_blacklist(filter_nets_var, sorted_nets, scrollable_frame_nets, blacklist_nets_vars))
-    filter_components_blacklist_var.trace_add("write", lambda *args: refresh_blacklist(filter_components_blacklist_var, components_list, scrollable_frame_components, blacklist_components_vars))
+    blacklist_nets_list = CheckList(blacklist_frame)
+    blacklist_nets_list.grid(row=2, column=0, sticky='nsew')
+
+    blacklist_components_list = CheckList(blacklist_frame)
+    blacklist_components_list.grid(row=2, column=1, sticky='nsew')
+
+    filter_nets_var.trace_add("write", lambda *args: blacklist_nets_list.schedule_filter(filter_nets_var.get()))
+    filter_components_blacklist_var.trace_add("write", lambda *args: blacklist_components_list.schedule_filter(filter_components_blacklist_var.get()))
 
     def execute_graphs():
         initial_node_component = component_var.get().split(' ')[0]
@@ -247,12 +462,110 @@ def start_interface():
         except ValueError:
             messagebox.showerror("Error", "Maximun depth and Path number must be integer.")
             return
-
-        blacklist_nets = [net for net, var in blacklist_nets_vars.items() if var.get()]
-        blacklist_components = [comp for comp, var in blacklist_components_vars.items() if var.get()]
-        graph.graphs(file_content, nets, components, initial_node, component_target, depth_max, blacklist_nets, blacklist_components, num_path=num_path)
-
-    tk.Button(root, text="Execute", command=execute_graphs).pack(pady=20)
+        try:
+            node_budget = int(node_budget_var.get()) if node_budget_var.get().strip() else None
+        except ValueError:
+            messagebox.showerror("Error", "Node budget must be an integer or empty.")
+            return
+        rail_thresholds = read_rail_thresholds()
+        if rail_thresholds is None:
+            messagebox.showerror("Error", "Rail minimum pins must be an integer and minimum share a number.")
+            return
+        rail_mode = rail_mode_var.get()
+
+        blacklist_nets = blacklist_nets_list.checked_items()
+        blacklist_components = blacklist_components_list.checked_items()
+        renderer = 'light' if light_renderer_var.get() else 'pyvis'
+        engine = 'sparse' if sparse_engine_var.get() else 'python'
+        show_stats = show_stats_var.get()
+        # In watch mode the open tab reloads itself, so the browser is only opened once
+        live_reload = watch_var.get()
+        open_browser = not (live_reload and page_opened[0])
+
+        def work(cancel, progress):
+            stats = instrument.Stats(on_stage=lambda name: progress(f"Running {name.replace('_', ' ')}..."))
+            return graph.graphs(descriptions, nets, components, initial_node, component_target, depth_max, blacklist_nets, blacklist_components, num_path=num_path, graph=netlist_graph,
+                                renderer=renderer, show_stats=show_stats, stats=stats, cancel=cancel, cache=session_cache, engine=engine,
+                                rail_mode=rail_mode, rail_min_pins=rail_thresholds[0], rail_min_share=rail_thresholds[1],
+                                open_browser=open_browser, live_reload=live_reload, node_budget=node_budget)
+
+        def done(stats):
+            page_opened[0] = True
+            status_var.set(f"Done in {stats.total_seconds():.2f} s.")
+
+        task.start("Running query", work, done)
+
+    light_renderer_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(root, text="Lightweight renderer (large graphs)", variable=light_renderer_var).pack()
+    budget_frame = tk.Frame(root)
+    budget_frame.pack()
+    tk.Label(budget_frame, text="Node budget (lightweight, empty for all):").grid(row=0, column=0)
+    node_budget_var = tk.StringVar(value=str(lod.NODE_BUDGET))
+    tk.Entry(budget_frame, textvariable=node_budget_var, width=8).grid(row=0, column=1, padx=5)
+    sparse_engine_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(root, text="Vectorized depth search (NumPy/SciPy)", variable=sparse_engine_var).pack()
+    show_stats_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(root, text="Show timings", variable=show_stats_var).pack()
+    watch_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(root, text="Watch the file and refresh the open graph", variable=watch_var).pack()
+    # Whether graph.html has been opened in the browser for the loaded file
+    page_opened = [False]
+
+    def read_rail_thresholds():
+        try:
+            return int(rail_min_pins_var.get()), float(rail_min_share_var.get()) / 100
+        except ValueError:
+            return None
+
+    def detected_rails():
+        thresholds = read_rail_thresholds()
+        if thresholds is None or globals().get('netlist_graph') is None:
+            return []
+        return rails.graph_rails(netlist_graph, nets, *thresholds)
+
+    def update_rails(*args):
+        found = detected_rails()
+        shown = ', '.join(found[:10]) + (f" and {len(found) - 10} more" if len(found) > 10 else '')
+        rails_found_var.set(f"Detected: {shown or 'none'}")
+
+    def blacklist_rails():
+        blacklist_nets_list.checked.update(detected_rails())
+        blacklist_nets_list.redraw()
+
+    rails_frame = tk.Frame(root)
+    rails_frame.pack(pady=5)
+    tk.Label(rails_frame, text="High-fanout rails:").grid(row=0, column=0)
+    rail_mode_var = tk.StringVar(value='off')
+    ttk.Combobox(rails_frame, textvariable=rail_mode_var, values=rails.RAIL_MODES, state='readonly', width=10).grid(row=0, column=1, padx=5)
+    tk.Label(rails_frame, text="Min pins:").grid(row=0, column=2)
+    rail_min_pins_var = tk.StringVar(value=str(rails.MIN_PINS))
+    tk.Entry(rails_frame, textvariable=rail_min_pins_var, width=6).grid(row=0, column=3, padx=5)
+    tk.Label(rails_frame, text="Min share (%):").grid(row=0, column=4)
+    rail_min_share_var = tk.StringVar(value=f"{rails.MIN_SHARE * 100:g}")
+    tk.Entry(rails_frame, textvariable=rail_min_share_var, width=6).grid(row=0, column=5, padx=5)
+    rails_found_var = tk.StringVar()
+    tk.Label(rails_frame, textvariable=rails_found_var, wraplength=400).grid(row=1, column=0, columnspan=5)
+    tk.Button(rails_frame, text="Blacklist these", command=blacklist_rails).grid(row=1, column=5)
+    rail_min_pins_var.trace_add("write", update_rails)
+    rail_min_share_var.trace_add("write", update_rails)
+
+    run_frame = tk.Frame(root)
+    run_frame.pack(pady=(20, 5))
+    execute_button = tk.Button(run_frame, text="Execute", command=execute_graphs)
+    execute_button.grid(row=0, column=0, padx=5)
+    cancel_button = tk.Button(run_frame, text="Cancel", command=task.cancel, state=tk.DISABLED)
+    cancel_button.grid(row=0, column=1, padx=5)
+    tk.Label(root, textvariable=status_var).pack(pady=(0, 10))
+
+    task.busy_widgets = [load_button, execute_button]
+    task.cancel_button = cancel_button
+    poll_watch()
+
+    if os.environ.get('NETLIST_STARTUP_PROBE'):
+        # Used by benchmark.py --startup: draw the first window and exit
+        root.update()
+        root.destroy()
+        return
 
     root.mainloop()
 
@@ -0,0 +1,263 @@
+from array import array
+from collections import OrderedDict
+
+# Node kinds
+PIN = 0
+NET = 1
+COMPONENT = 2
+
+# apply_diff folds the patch back into the CSR arrays once it covers this share of the nodes
+PATCH_COMPACT_RATIO = 0.25
+# Blocked sets whose connectivity labels are kept, most recently used last
+CONNECTIVITY_CACHE_SIZE = 8
+
+
+class NetlistGraph:
+    """Pins, nets and components interned to integer ids with CSR adjacency.
+
+    Node ``i`` is named ``names[i]`` and tagged ``kinds[i]``; its neighbours are
+    ``targets[offsets[i]:offsets[i + 1]]``, unless apply_diff moved the row into
+    ``patch``. Edges join every pin to its net and to its component, in the
+    same order ``nx.Graph.add_edge`` would see them. ``version`` counts the
+    diffs applied.
+    """
+
+    def __init__(self, nets, components, blacklist_nets=(), blacklist_components=()):
+        self._connectivity = OrderedDict()
+        self.patch = {}
+        self.version = 0
+        self.names = []
+        self.index = {}
+        self.kinds = array('b')
+
+        sources = array('i')
+        destinations = array('i')
+        for groups, kind, blacklist in ((nets, NET, blacklist_nets), (components, COMPONENT, blacklist_components)):
+            blacklist = set(blacklist)
+            for group, pins in groups.items():
+                if group in blacklist:
+                    continue
+                group_id = self._intern(group, kind)
+                for pin in dict.fromkeys(pins):
+                    sources.append(self._intern(pin, PIN))
+                    destinations.append(group_id)
+
+        # Counting sort of both edge directions into CSR rows
+        node_count = len(self.names)
+        degrees = array('q', bytes(8 * (node_count + 1)))
+        for node in sources:
+            degrees[node + 1] += 1
+        for node in destinations:
+            degrees[node + 1] += 1
+        for i in range(node_count):
+            degrees[i + 1] += degrees[i]
+        self.offsets = degrees
+        self.edge_count = len(sources)
+
+        cursor = array('q', degrees)
+        self.targets = array('i', bytes(4 * len(sources) * 2))
+        for source, destination in zip(sources, destinations):
+            self.targets[cursor[source]] = destination
+            cursor[source] += 1
+            self.targets[cursor[destination]] = source
+            cursor[destination] += 1
+
+    @classmethod
+    def from_arrays(cls, names, kinds, offsets, targets):
+        """Return the graph with these names and CSR arrays, as stored by a cache snapshot."""
+        graph = cls({}, {})
+        graph.names = names
+        graph.index = dict(zip(names, range(len(names))))
+        graph.kinds, graph.offsets, graph.targets = kinds, offsets, targets
+        graph.edge_count = len(targets) // 2
+        return graph
+
+    def _intern(self, name, kind):
+        node = self.index.get(name)
+        if node is None:
+            node = self.index[name] = len(self.names)
+            self.names.append(name)
+            self.kinds.append(kind)
+        elif kind == NET or (kind == COMPONENT and self.kinds[node] == PIN):
+            # Same precedence as the renderer: net, then component, then pin
+            self.kinds[node] = kind
+        return node
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def blocked_nodes(self, blacklist_nets=(), blacklist_components=()):
+        """Return the ids a traversal must skip for these blacklists, in O(blacklist)."""
+        blocked = set()
+        for name in blacklist_nets:
+            node = self.index.get(name)
+            if node is not None and self.kinds[node] == NET:
+                blocked.add(node)
+        for name in blacklist_components:
+            node = self.index.get(name)
+            if node is not None and self.kinds[node] == COMPONENT:
+                blocked.add(node)
+        return blocked
+
+    def connectivity(self, blocked=frozenset()):
+        """Return the ConnectivityIndex of this version with ``blocked`` removed.
+
+        The last CONNECTIVITY_CACHE_SIZE blocked sets are kept, so a repeated
+        blacklist is answered without labelling the graph again.
+        """
+        key = frozenset(blocked)
+        index = self._connectivity.get(key)
+        if index is None:
+            index = self._connectivity[key] = ConnectivityIndex(self, key)
+            if len(self._connectivity) > CONNECTIVITY_CACHE_SIZE:
+                self._connectivity.popitem(last=False)
+        else:
+            self._connectivity.move_to_end(key)
+        return index
+
+    def number_of_edges(self):
+        return self.edge_count
+
+    def neighbors(self, node):
+        if self.patch:
+            row = self.patch.get(node)
+            if row is not None:
+                return row
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def _patch_row(self, node):
+        row = self.patch.get(node)
+        if row is None:
+            # Nodes added by a diff have no CSR row
+            row = self.patch[node] = list(self.neighbors(node)) if node < len(self.offsets) - 1 else []
+        return row
+
+    def apply_diff(self, diff):
+        """Patch the graph in place with a netdiff.NetlistDiff instead of rebuilding it.
+
+        Only the rows of touched nodes are copied into ``patch``. New names get
+        new ids; removed ones keep their id with no edges but leave ``index``.
+        """
+        removals = {}
+        halves = 0
+        for edges in (diff.removed_net_edges, diff.removed_component_edges):
+            for pin, group in edges:
+                u, v = self.index.get(pin), self.index.get(group)
+                if u is None or v is None:
+                    continue
+                removals.setdefault(u, set()).add(v)
+                removals.setdefault(v, set()).add(u)
+        for node, gone in removals.items():
+            row = self._patch_row(node)
+            kept = [neighbor for neighbor in row if neighbor not in gone]
+            halves += len(row) - len(kept)
+            self.patch[node] = kept
+        # Each removed edge was dropped from both of its rows
+        self.edge_count -= halves // 2
+
+        for name in diff.removed_names():
+            node = self.index.get(name)
+            if node is not None and not self.neighbors(node):
+                del self.index[name]
+
+        for edges, kind in ((diff.added_net_edges, NET), (diff.added_component_edges, COMPONENT)):
+            for pin, group in edges:
+                group_id = self._intern(group, kind)
+                pin_id = self._intern(pin, PIN)
+                self._patch_row(pin_id).append(group_id)
+                self._patch_row(group_id).append(pin_id)
+                self.edge_count += 1
+        for name in diff.added_nets | diff.added_components:
+            # A group can come back without pins
+            kind = NET if name in diff.added_nets else COMPONENT
+            if name not in self.index:
+                self._patch_row(self._intern(name, kind))
+
+        if len(self.patch) > PATCH_COMPACT_RATIO * len(self.names):
+            self.compact()
+        self._connectivity.clear()
+        self.version += 1
+
+    def compact(self):
+        """Rebuild the CSR arrays from the current rows and empty ``patch``."""
+        offsets = array('q', [0])
+        targets = array('i')
+        for node in range(len(self.names)):
+            targets.extend(self.neighbors(node))
+            offsets.append(len(targets))
+        self.offsets, self.targets = offsets, targets
+        self.patch = {}
+
+    def edges_within(self, nodes):
+        """Yield each edge with both ends in the id set ``nodes`` once."""
+        for node in sorted(nodes):
+            for neighbor in self.neighbors(node):
+                if neighbor > node and neighbor in nodes:
+                    yield node, neighbor
+
+    def to_scipy(self):
+        """Return the adjacency as a ``scipy.sparse`` CSR matrix of int32 ones."""
+        import numpy as np
+        from scipy import sparse
+
+        if self.patch or len(self.offsets) != len(self.names) + 1:
+            self.compact()
+        indptr = np.frombuffer(self.offsets, dtype=np.int64)
+        indices = np.frombuffer(self.targets, dtype=np.int32)
+        data = np.ones(len(indices), dtype=np.int32)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(self.names), len(self.names)))
+
+    def to_networkx(self, nodes=None):
+        """Return an ``nx.Graph`` of string nodes, optionally limited to an id set."""
+        import networkx as nx
+
+        G = nx.Graph()
+        if nodes is None:
+            nodes = self.index.values()
+        names = self.names
+        G.add_nodes_from(names[node] for node in sorted(nodes))
+        G.add_edges_from((names[u], names[v]) for u, v in self.edges_within(set(nodes)))
+        return G
+
+
+class ConnectivityIndex:
+    """Connected-component labels of a NetlistGraph without the ids in ``blocked``.
+
+    Blocked nodes get label -2 and belong to no component, so two nodes with
+    different labels cannot be joined by a search that skips them, and a
+    component's size bounds what such a search can reach.
+    """
+
+    def __init__(self, graph, blocked=frozenset()):
+        labels = self.labels = array('i', [-1]) * len(graph)
+        for node in blocked:
+            labels[node] = -2
+        self.sizes = []
+        neighbors = graph.neighbors
+        for start in range(len(graph)):
+            if labels[start] != -1:
+                continue
+            label = len(self.sizes)
+            labels[start] = label
+            stack = [start]
+            size = 0
+            while stack:
+                node = stack.pop()
+                size += 1
+                for neighbor in neighbors(node):
+                    if labels[neighbor] == -1:
+                        labels[neighbor] = label
+                        stack.append(neighbor)
+            self.sizes.append(size)
+
+    def component(self, node):
+        return self.labels[node]
+
+    def connected(self, u, v):
+        return self.labels[u] == self.labels[v]
+
+    def component_size(self, node):
+        return self.sizes[self.labels[node]]
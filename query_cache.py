@@ -0,0 +1,117 @@
+'''
+Session cache of query results.
+
+Flipping between a few source/target/depth/blacklist combinations in the GUI
+should not redo the searches and the rendering every time. Entries are keyed
+on the normalized query and tied to one graph object and its version, so
+loading another file or applying a diff empties the cache.
+'''
+from collections import OrderedDict
+
+# Rough default budget for all cached results
+MAX_BYTES = 64 * 1024 * 1024
+
+
+def normalize_query(initial_node, component_target=None, max_depth=0, blacklist_nets=(), blacklist_components=(), num_path=1,
+                    rail_mode='off', rail_nets=()):
+    """Return the hashable key two equivalent queries share."""
+    return (
+        initial_node,
+        component_target or None,
+        max(int(max_depth or 0), 0),
+        tuple(sorted(set(blacklist_nets or ()))),
+        tuple(sorted(set(blacklist_components or ()))),
+        int(num_path or 1),
+        rail_mode,
+        tuple(rail_nets),
+    )
+
+
+class CachedQuery:
+    """Paths and depth-limited nodes of one query, plus its HTML per renderer."""
+
+    def __init__(self, paths, nodes):
+        self.paths = paths
+        self.nodes = frozenset(nodes)
+        self.html = {}
+
+    def size(self):
+        # Strings are shared with the graph; count a pointer-ish cost per name plus the HTML bytes
+        names = len(self.nodes) + sum(len(path) for path in self.paths)
+        return 256 + 64 * names + sum(len(html) for html in self.html.values())
+
+
+class QueryCache:
+    """Bounded LRU of CachedQuery entries, evicted by estimated memory use.
+
+    keep_html=False stores only the search results, so a hit still renders.
+    """
+
+    def __init__(self, max_bytes=MAX_BYTES, keep_html=True):
+        self.max_bytes = max_bytes
+        self.keep_html = keep_html
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.graph = None
+        self.version = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+        self.graph = None
+        self.version = None
+
+    def _check_graph(self, graph):
+        # Holding the graph keeps its id from being reused by a new one
+        if graph is not self.graph or graph.version != self.version:
+            self.clear()
+            self.graph = graph
+            self.version = graph.version
+
+    def get(self, graph, key):
+        self._check_graph(graph)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, graph, key, paths, nodes):
+        self._check_graph(graph)
+        self._remove(key)
+        entry = CachedQuery(paths, nodes)
+        self._store(key, entry)
+        return entry
+
+    def put_html(self, key, renderer, html):
+        entry = self.entries.get(key)
+        if entry is None or not self.keep_html:
+            return
+        self._remove(key)
+        entry.html[renderer] = html
+        if entry.size() > self.max_bytes:
+            # Too big to keep as a page; the search results still fit
+            del entry.html[renderer]
+        self._store(key, entry)
+
+    def _remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry.size()
+
+    def _store(self, key, entry):
+        size = entry.size()
+        if size > self.max_bytes:
+            return
+        self.entries[key] = entry
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= evicted.size()
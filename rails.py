@@ -0,0 +1,65 @@
+'''
+High-fanout rail detection.
+
+GND, +3V3, VBUS and similar nets connect so many pins that a search flooding
+through them reaches most of the board. classify_rails picks them out by pin
+count; graph.graphs can then only list them (suggest), blacklist them, or
+collapse each into a node the searches reach but never expand through.
+'''
+import weakref
+
+RAIL_MODES = ('off', 'suggest', 'blacklist', 'collapse')
+
+# A net is a rail with at least this many pins...
+MIN_PINS = 50
+# ...or at least this share of all the pins on nets
+MIN_SHARE = 0.02
+# The share never flags nets below this size, so small boards keep their signal nets
+FLOOR_PINS = 10
+
+
+# Per graph: (version, net sizes, {thresholds: rails}), dropped with the graph
+_graph_rails = weakref.WeakKeyDictionary()
+
+
+def net_sizes(nets):
+    return {net: len(set(pins)) for net, pins in nets.items()}
+
+
+def classify_sizes(sizes, min_pins=MIN_PINS, min_share=MIN_SHARE):
+    total = sum(sizes.values())
+    threshold = min(min_pins, max(min_share * total, FLOOR_PINS))
+    rails = [net for net, size in sizes.items() if size >= threshold]
+    return sorted(rails, key=lambda net: sizes[net], reverse=True)
+
+
+def classify_rails(nets, min_pins=MIN_PINS, min_share=MIN_SHARE):
+    """Return the rail net names, largest first."""
+    return classify_sizes(net_sizes(nets), min_pins, min_share)
+
+
+def graph_rails(graph, nets, min_pins=MIN_PINS, min_share=MIN_SHARE):
+    """classify_rails(nets) for the netlist graph was built from, kept per graph version and thresholds.
+
+    The net sizes are counted once per version, so repeated queries and
+    threshold edits in the GUI do not go over every net again.
+    """
+    entry = _graph_rails.get(graph)
+    if entry is None or entry[0] != graph.version:
+        entry = _graph_rails[graph] = (graph.version, net_sizes(nets), {})
+    found = entry[2].get((min_pins, min_share))
+    if found is None:
+        found = entry[2][min_pins, min_share] = classify_sizes(entry[1], min_pins, min_share)
+    return list(found)
+
+
+def describe(mode, rail_nets):
+    """One line for the parameters panel."""
+    if mode == 'off':
+        return "off"
+    names = ', '.join(rail_nets) if rail_nets else 'none found'
+    if mode == 'suggest':
+        return f"suggested, not applied: {names}"
+    if mode == 'blacklist':
+        return f"blacklisted: {names}"
+    return f"collapsed, not expanded: {names}"
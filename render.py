@@ -0,0 +1,231 @@
+'''
+Lightweight graph.html writer.
+
+Nodes and edges are streamed as compact JSON into a small page that loads
+vis-network from a lib folder next to the output, copied once from the pyvis
+installation, instead of inlining every library into every file.
+'''
+import importlib.util
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+VIS_VERSION = 'vis-9.1.2'
+
+# Above this many nodes the layout switches to settings that settle quickly
+LARGE_GRAPH = 1000
+
+PAGE_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<link rel="stylesheet" href="{lib}/vis-network.css">
+<script src="{lib}/vis-network.min.js"></script>
+<style>
+    body {{ margin: 0; padding: 0; overflow: hidden; }}
+    #mynetwork {{ width: 100%; height: 100vh; }}
+</style>
+</head>
+<body>
+<div id="mynetwork"></div>
+<script>
+var nodes = new vis.DataSet([
+"""
+
+PAGE_SCRIPT = """var network = new vis.Network(document.getElementById('mynetwork'), {nodes: nodes, edges: edges}, options);
+network.once('stabilizationIterationsDone', function () { network.setOptions({physics: false}); });
+</script>
+"""
+
+# Added to the page in watch mode: reload when the version file next to it changes
+RELOAD_SCRIPT = """<script src="{version_file}"></script>
+<script>
+var loadedVersion = window.graphVersion;
+setInterval(function () {{
+    var probe = document.createElement('script');
+    probe.src = '{version_file}?' + Date.now();
+    probe.onload = function () {{
+        probe.remove();
+        if (window.graphVersion !== loadedVersion) {{ location.reload(); }}
+    }};
+    probe.onerror = function () {{ probe.remove(); }};
+    document.body.appendChild(probe);
+}}, {interval_ms});
+</script>
+"""
+
+RELOAD_INTERVAL_MS = 1000
+
+# Level-of-detail pages (lod.py): drawn edges are derived from the full edge list
+LOD_SETUP_SCRIPT = """var children = {};
+Object.keys(owner).forEach(function (id) { (children[owner[id]] = children[owner[id]] || []).push(id); });
+function shownAs(id) {
+    while (owner.hasOwnProperty(id)) { id = owner[id]; }
+    return id;
+}
+function refreshEdges() {
+    var seen = new Set(), drawn = [];
+    fineEdges.forEach(function (edge) {
+        var from = shownAs(edge.from), to = shownAs(edge.to);
+        var key = from < to ? from + '\\n' + to : to + '\\n' + from;
+        if (from === to || seen.has(key)) { return; }
+        seen.add(key);
+        if (from === edge.from && to === edge.to) { drawn.push(edge); return; }
+        var clustered = clusters.has(from) || clusters.has(to);
+        drawn.push({from: from, to: to, color: clustered ? 'gray' : edge.color, width: 1, dashes: clustered});
+    });
+    edges.clear();
+    edges.add(drawn);
+}
+refreshEdges();
+"""
+
+LOD_EXPAND_SCRIPT = """<script>
+function expand(id) {
+    var members = children[id];
+    if (!members) { return; }
+    delete children[id];
+    var at = network.getPositions([id])[id];
+    members.forEach(function (member) { delete owner[member]; });
+    nodes.add(members.map(function (member) {
+        return Object.assign({}, hiddenNodes[member], {x: at.x + 40 * (Math.random() - 0.5), y: at.y + 40 * (Math.random() - 0.5)});
+    }));
+    if (clusters.has(id)) { nodes.remove(id); } else { nodes.update(Object.assign({title: null}, plainNodes[id])); }
+    refreshEdges();
+    network.setOptions({physics: true});
+    network.once('stabilizationIterationsDone', function () { network.setOptions({physics: false}); });
+    network.stabilize(100);
+}
+network.on('doubleClick', function (params) { if (params.nodes.length) { expand(params.nodes[0]); } });
+</script>
+"""
+
+
+def vis_assets_dir():
+    """Return the folder holding the vis-network files shipped with pyvis."""
+    bundle_dir = getattr(sys, '_MEIPASS', None)
+    if bundle_dir:
+        # PyInstaller build, see build_spec_example.py
+        return os.path.join(bundle_dir, 'pyvis', 'templates', 'lib', VIS_VERSION)
+    spec = importlib.util.find_spec('pyvis')
+    return os.path.join(os.path.dirname(spec.origin), 'templates', 'lib', VIS_VERSION)
+
+
+def ensure_assets(output_dir):
+    """Copy vis-network next to the output once and return its relative URL."""
+    target = os.path.join(output_dir, 'lib', VIS_VERSION)
+    if not os.path.isfile(os.path.join(target, 'vis-network.min.js')):
+        shutil.copytree(vis_assets_dir(), target, dirs_exist_ok=True)
+    return f"lib/{VIS_VERSION}"
+
+
+def layout_options(node_count):
+    options = {
+        'interaction': {'hideEdgesOnDrag': True, 'tooltipDelay': 200},
+        'physics': {'stabilization': {'iterations': 200, 'updateInterval': 25}},
+    }
+    if node_count > LARGE_GRAPH:
+        # improvedLayout and smooth edges are quadratic-ish in the node count
+        options['layout'] = {'improvedLayout': False}
+        options['edges'] = {'smooth': False}
+        options['physics'] = {
+            'solver': 'forceAtlas2Based',
+            'forceAtlas2Based': {'gravitationalConstant': -50, 'springLength': 60},
+            'timestep': 0.5,
+            'stabilization': {'iterations': 100, 'updateInterval': 50},
+        }
+    return options
+
+
+def to_json(item):
+    # Drop unset fields and keep '</script>' in a name from closing the script
+    item = {key: value for key, value in item.items() if value is not None}
+    return json.dumps(item, separators=(',', ':')).replace('</', '<\\/')
+
+
+def write_items(file, items):
+    for item in items:
+        file.write(to_json(item))
+        file.write(',\n')
+
+
+def write_entries(file, items):
+    """Write a {name: node dict} mapping as the body of a JS object literal."""
+    for name, item in items.items():
+        file.write(json.dumps(name).replace('</', '<\\/'))
+        file.write(':')
+        file.write(to_json(item))
+        file.write(',\n')
+
+
+def write_lod_html(file_path, drawn, hidden, owner, expanded, clusters, edges, parameters_html=''):
+    """Like write_html for a lod.plan_lod view; returns the bytes written.
+
+    drawn are the node dicts shown at first, hidden maps names to the dicts
+    revealed by a double-click, owner maps each hidden name to what stands in
+    for it, expanded holds the plain dicts of folded components, clusters are
+    the cluster node names and edges are every edge of the subgraph.
+    """
+    lib = ensure_assets(os.path.dirname(os.path.abspath(file_path)))
+    with open(file_path, 'w', encoding='utf-8') as file:
+        file.write(PAGE_HEAD.format(lib=lib))
+        write_items(file, drawn)
+        file.write("]);\nvar edges = new vis.DataSet([]);\nvar hiddenNodes = {\n")
+        write_entries(file, hidden)
+        file.write("};\nvar plainNodes = {\n")
+        write_entries(file, expanded)
+        file.write("};\nvar owner = ")
+        file.write(json.dumps(owner, separators=(',', ':')).replace('</', '<\\/'))
+        file.write(";\nvar clusters = new Set(")
+        file.write(json.dumps(list(clusters)).replace('</', '<\\/'))
+        file.write(");\nvar fineEdges = [\n")
+        write_items(file, edges)
+        file.write("];\n")
+        file.write(LOD_SETUP_SCRIPT)
+        file.write("var options = ")
+        file.write(json.dumps(layout_options(len(drawn))))
+        file.write(";\n")
+        file.write(PAGE_SCRIPT)
+        file.write(LOD_EXPAND_SCRIPT)
+        file.write(parameters_html)
+        file.write("\n</body>\n</html>\n")
+        return file.tell()
+
+
+def write_html(file_path, nodes, edges, node_count, parameters_html=''):
+    """Stream the node and edge dicts into file_path and return the bytes written."""
+    lib = ensure_assets(os.path.dirname(os.path.abspath(file_path)))
+    with open(file_path, 'w', encoding='utf-8') as file:
+        file.write(PAGE_HEAD.format(lib=lib))
+        write_items(file, nodes)
+        file.write("]);\nvar edges = new vis.DataSet([\n")
+        write_items(file, edges)
+        file.write("]);\nvar options = ")
+        file.write(json.dumps(layout_options(node_count)))
+        file.write(";\n")
+        file.write(PAGE_SCRIPT)
+        file.write(parameters_html)
+        file.write("\n</body>\n</html>\n")
+        return file.tell()
+
+
+def version_file(file_path):
+    """graph.html -> graph_version.js, in the same folder."""
+    return os.path.splitext(os.path.abspath(file_path))[0] + '_version.js'
+
+
+def reload_script(file_path):
+    # A script tag rather than fetch(), which browsers refuse on file:// pages
+    return RELOAD_SCRIPT.format(version_file=os.path.basename(version_file(file_path)), interval_ms=RELOAD_INTERVAL_MS)
+
+
+def write_version(file_path):
+    """Give the page at file_path a new version, so open copies of it reload."""
+    path = version_file(file_path)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as file:
+        file.write(f'var graphVersion = "{time.time_ns()}";\n')
+    os.replace(tmp_path, path)
@@ -0,0 +1,390 @@
+'''
+Local query server: parse netlists once and answer queries over HTTP/JSON.
+
+    python server.py board.NET rev_b=board_rev_b.NET --port 8765
+
+Endpoints take GET query parameters or a POST JSON body:
+
+    /netlists                      the loaded netlists
+    /load          path, name      load another netlist (kept if its content is unchanged)
+    /path          source, target, num_path, blacklist_nets, blacklist_components
+    /neighborhood  source, depth, blacklist_nets, blacklist_components
+    /description   name            a component's description and pins, or a net's pins
+    /graph.html    the /path and /neighborhood parameters, renderer, rail_mode, node_budget
+
+Every query also takes netlist, the name given at load time, which can be
+left out while only one netlist is loaded. Lists are JSON arrays in a body
+and ';'-separated strings in a query string, as in batch.py.
+
+Connections are served by asyncio; the searches and rendering run on a
+thread pool, one at a time per netlist. The server only listens on
+localhost unless told otherwise: /load reads any file the user can.
+'''
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import batch
+import graph
+import loader
+import lod
+import query_cache
+import rails
+import render
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# Threads running searches, loads and rendering
+WORKERS = 4
+# Largest request body accepted
+MAX_BODY = 1024 * 1024
+
+
+class RequestError(Exception):
+    """A request the server refuses, with the HTTP status to answer."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class LoadedNetlist:
+    """One parsed netlist with its graph and query cache.
+
+    Searches build the graph's connectivity index on first use and update
+    the cache, so queries on one netlist hold ``lock``.
+    """
+
+    def __init__(self, name, file_path, output_dir):
+        self.name = name
+        self.file_path = os.path.abspath(file_path)
+        self.digest = loader.file_digest(file_path)
+        self.nets, self.components, self.descriptions, self.graph = loader.load_file(file_path, digest=self.digest, with_graph=True)
+        self.cache = query_cache.QueryCache()
+        self.lock = threading.Lock()
+        fd, self.page_path = tempfile.mkstemp(suffix='.html', dir=output_dir)
+        os.close(fd)
+
+    def info(self):
+        return {
+            'name': self.name,
+            'path': self.file_path,
+            'nets': len(self.nets),
+            'components': len(self.components),
+            'nodes': len(self.graph),
+            'edges': self.graph.number_of_edges(),
+        }
+
+
+def netlist_name(file_path):
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+
+def query_parameters(target, body):
+    """Merge the query string and a JSON object body into one dict."""
+    params = {key: values[-1] for key, values in urllib.parse.parse_qs(urllib.parse.urlsplit(target).query).items()}
+    if body:
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Body is not JSON.")
+        if not isinstance(payload, dict):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object.")
+        params.update(payload)
+    return params
+
+
+def check_query_fields(params):
+    """Raise a RequestError naming the first query field of the wrong type."""
+    for field in ('source', 'target'):
+        value = params.get(field)
+        if value is not None and not isinstance(value, str):
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"{field} must be a string.")
+    for field in ('depth', 'num_path'):
+        value = params.get(field)
+        if value is None or value == '':
+            continue
+        try:
+            if isinstance(value, bool) or not isinstance(value, (int, str)):
+                raise TypeError
+            int(value)
+        except (TypeError, ValueError):
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"{field} must be an integer.")
+    for field in ('blacklist_nets', 'blacklist_components'):
+        value = params.get(field)
+        if value is None or isinstance(value, str):
+            continue
+        if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"{field} must be a list of names or a ';'-separated string.")
+
+
+def name_field(params, field, required=True):
+    """Return params[field], raising a RequestError naming it unless it is a non-empty string.
+
+    An absent optional field is None. Other types are refused before they
+    reach a lookup or the file system, where an integer path would be taken
+    for a file descriptor.
+    """
+    value = params.get(field)
+    if value is None:
+        if required:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"{field} is required.")
+        return None
+    if not isinstance(value, str) or not value:
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"{field} must be a non-empty string.")
+    return value
+
+
+class QueryServer:
+    def __init__(self, workers=WORKERS):
+        self.netlists = {}
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.output_dir = tempfile.mkdtemp(prefix='netlist-graph-')
+        self.load_lock = threading.Lock()
+        self.routes = {
+            '/netlists': self.list_netlists,
+            '/load': self.load,
+            '/path': self.path,
+            '/neighborhood': self.neighborhood,
+            '/description': self.description,
+            '/graph.html': self.page,
+        }
+
+    # Handlers run on the thread pool; they return a JSON-able object or (bytes, content type)
+
+    def list_netlists(self, params):
+        # load() adds to the dict from another thread
+        with self.load_lock:
+            netlists = list(self.netlists.values())
+        return {'netlists': [netlist.info() for netlist in netlists]}
+
+    def load(self, params):
+        file_path = name_field(params, 'path')
+        if not os.path.isfile(file_path):
+            raise RequestError(HTTPStatus.NOT_FOUND, f"No such file: {file_path}")
+        name = name_field(params, 'name', required=False) or netlist_name(file_path)
+        # One load at a time; the parse cache makes a repeated load cheap anyway
+        with self.load_lock:
+            loaded = self.netlists.get(name)
+            if loaded is not None and loaded.file_path == os.path.abspath(file_path) and loaded.digest == loader.file_digest(file_path):
+                return dict(loaded.info(), reused=True)
+            try:
+                loaded = LoadedNetlist(name, file_path, self.output_dir)
+            except ValueError as error:
+                raise RequestError(HTTPStatus.UNPROCESSABLE_ENTITY, str(error))
+            self.netlists[name] = loaded
+        return dict(loaded.info(), reused=False)
+
+    def netlist(self, params):
+        name = name_field(params, 'netlist', required=False)
+        if name is None:
+            if len(self.netlists) != 1:
+                raise RequestError(HTTPStatus.BAD_REQUEST, "netlist is required when zero or several are loaded.")
+            return next(iter(self.netlists.values()))
+        netlist = self.netlists.get(name)
+        if netlist is None:
+            raise RequestError(HTTPStatus.NOT_FOUND, f"Unknown netlist: {name}")
+        return netlist
+
+    def query(self, params):
+        """Return the netlist and the normalized batch.py query the parameters describe."""
+        netlist = self.netlist(params)
+        check_query_fields(params)
+        try:
+            query = batch.normalize_query(params)
+        except KeyError as error:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"{error.args[0]} is required.")
+        for node in (query['source'], query['target']):
+            if node is not None and node not in netlist.graph:
+                raise RequestError(HTTPStatus.NOT_FOUND, f"Unknown node: {node}")
+        return netlist, query
+
+    def search(self, netlist, query):
+        """Paths and nodes of a query, from the netlist's cache when it was asked before."""
+        key = query_cache.normalize_query(query['source'], query['target'], query['depth'], query['blacklist_nets'],
+                                          query['blacklist_components'], query['num_path'])
+        with netlist.lock:
+            entry = netlist.cache.get(netlist.graph, key)
+            if entry is None:
+                paths, nodes = graph.run_query(netlist.graph, query['source'], query['target'], max(query['depth'], 0),
+                                               query['blacklist_nets'], query['blacklist_components'], query['num_path'], verbose=False)
+                entry = netlist.cache.put(netlist.graph, key, paths, nodes)
+        return entry
+
+    def path(self, params):
+        netlist, query = self.query(params)
+        if query['target'] is None:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "target is required.")
+        query['depth'] = 0
+        return dict(query, netlist=netlist.name, paths=self.search(netlist, query).paths)
+
+    def neighborhood(self, params):
+        netlist, query = self.query(params)
+        query['target'] = None
+        return dict(query, netlist=netlist.name, nodes=sorted(self.search(netlist, query).nodes))
+
+    def description(self, params):
+        netlist = self.netlist(params)
+        name = name_field(params, 'name')
+        if name in netlist.components:
+            return {'netlist': netlist.name, 'component': name, 'pins': netlist.components[name],
+                    'description': loader.format_description(netlist.descriptions.get(name))}
+        if name in netlist.nets:
+            return {'netlist': netlist.name, 'net': name, 'pins': netlist.nets[name]}
+        raise RequestError(HTTPStatus.NOT_FOUND, f"No component or net named {name}")
+
+    def page(self, params):
+        netlist, query = self.query(params)
+        renderer = params.get('renderer', 'light')
+        rail_mode = params.get('rail_mode', 'off')
+        if renderer not in ('light', 'pyvis') or rail_mode not in rails.RAIL_MODES:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Unknown renderer or rail_mode.")
+        try:
+            # 0 draws everything
+            node_budget = int(params.get('node_budget', lod.NODE_BUDGET)) or None
+        except (TypeError, ValueError):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "node_budget must be an integer.")
+        with netlist.lock:
+            graph.graphs(netlist.descriptions, netlist.nets, netlist.components, query['source'], query['target'], query['depth'],
+                         query['blacklist_nets'], query['blacklist_components'], query['num_path'], graph=netlist.graph,
+                         renderer=renderer, output_path=netlist.page_path, open_browser=False, cache=netlist.cache,
+                         rail_mode=rail_mode, verbose=False, node_budget=node_budget)
+            with open(netlist.page_path, 'rb') as file:
+                return file.read(), 'text/html; charset=utf-8'
+
+    def asset(self, path):
+        # Only the vis-network files the light renderer links to, by base name
+        name = os.path.basename(path)
+        if path != f"/lib/{render.VIS_VERSION}/{name}" or name not in ('vis-network.css', 'vis-network.min.js'):
+            raise RequestError(HTTPStatus.NOT_FOUND, f"Not found: {path}")
+        with open(os.path.join(render.vis_assets_dir(), name), 'rb') as file:
+            content_type = 'text/css' if name.endswith('.css') else 'application/javascript'
+            return file.read(), content_type
+
+    async def respond(self, method, target, body):
+        """Return (status, content type, payload bytes) for one request."""
+        path = urllib.parse.urlsplit(target).path
+        try:
+            if method not in ('GET', 'POST'):
+                raise RequestError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} is not supported.")
+            if path.startswith('/lib/'):
+                handler, argument = self.asset, path
+            else:
+                handler = self.routes.get(path)
+                if handler is None:
+                    raise RequestError(HTTPStatus.NOT_FOUND, f"Not found: {path}")
+                argument = query_parameters(target, body)
+            result = await asyncio.get_running_loop().run_in_executor(self.executor, handler, argument)
+        except RequestError as error:
+            return error.status, 'application/json', json.dumps({'error': str(error)}).encode()
+        except Exception as error:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, 'application/json', json.dumps({'error': f"{type(error).__name__}: {error}"}).encode()
+        if isinstance(result, tuple):
+            payload, content_type = result
+            return HTTPStatus.OK, content_type, payload
+        return HTTPStatus.OK, 'application/json', json.dumps(result).encode()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                if body is None:
+                    status, content_type, payload = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, 'application/json', b'{"error": "Body too large."}'
+                    keep_alive = False
+                else:
+                    status, content_type, payload = await self.respond(method, target, body)
+                    keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(response_head(status, content_type, len(payload), keep_alive) + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            # Client went away or sent something that is not HTTP
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Serving {', '.join(self.netlists) or 'no netlists'} on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+async def read_request(reader):
+    """Return (method, target, headers, body) of the next request, or None at the end of the connection.
+
+    body is None when it is larger than MAX_BODY.
+    """
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    method, target, _ = line.decode('latin-1').split(' ', 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        key, _, value = line.decode('latin-1').partition(':')
+        headers[key.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    if length > MAX_BODY:
+        return method, target, headers, None
+    body = await reader.readexactly(length) if length else b''
+    return method, target, headers, body
+
+
+def response_head(status, content_type, length, keep_alive):
+    return (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {length}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode('latin-1')
+
+
+def request(endpoint, url=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}", **params):
+    """Call a running server from a script: request('/path', source='U1-5', target='J2').
+
+    Returns the decoded JSON, or the page text for /graph.html.
+    """
+    data = json.dumps(params).encode()
+    http_request = urllib.request.Request(url.rstrip('/') + endpoint, data=data, headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(http_request) as response:
+        body = response.read()
+        if response.headers.get_content_type() == 'application/json':
+            return json.loads(body)
+        return body.decode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep netlists loaded and answer graph queries over HTTP/JSON")
+    parser.add_argument("netlists", nargs='*', help="Netlist files to preload, as path or name=path")
+    parser.add_argument("--host", type=str, default=DEFAULT_HOST, help="Address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Threads running the queries")
+    args = parser.parse_args()
+
+    server = QueryServer(args.workers)
+    for item in args.netlists:
+        name, named, file_path = item.partition('=')
+        if not named:
+            name, file_path = None, item
+        print(f"Loading {file_path}...")
+        server.load({'path': file_path, 'name': name})
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
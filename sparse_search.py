@@ -0,0 +1,155 @@
+'''
+Vectorized neighbourhood searches over a scipy.sparse adjacency matrix.
+
+find_nodes_up_to_depth gives the same result as the one in graph.py but
+expands a whole BFS level at a time: the frontier is a boolean vector, one
+sparse product finds its neighbours, and the excluded names and blacklists
+are masks. The bulk functions do the same for many components at once, with
+one frontier column per component.
+
+NumPy and SciPy are only needed when this module is used.
+'''
+import bisect
+import weakref
+
+import numpy as np
+from scipy import sparse
+
+import graph as graph_module
+import netmodel
+
+# Components expanded together in the bulk functions; bounds the memory of a level
+BATCH_SIZE = 256
+
+# Arrays derived from each graph, rebuilt when graph.version changes
+_arrays = weakref.WeakKeyDictionary()
+
+
+class GraphArrays:
+    """The adjacency matrix, node kinds and sorted names of one graph version."""
+
+    def __init__(self, graph):
+        self.version = graph.version
+        self.matrix = graph.to_scipy()
+        self.kinds = np.frombuffer(graph.kinds, dtype=np.int8)
+        names = graph.names
+        self.order = np.array(sorted(range(len(names)), key=names.__getitem__), dtype=np.int64)
+        self.sorted_names = [names[node] for node in self.order]
+
+    def prefix_ids(self, prefix):
+        """Ids of every name starting with prefix, found by bisecting the sorted names."""
+        low = bisect.bisect_left(self.sorted_names, prefix)
+        high = bisect.bisect_left(self.sorted_names, prefix + '\U0010ffff', low)
+        return self.order[low:high]
+
+    def allowed_mask(self, blocked=(), excluded=()):
+        """False for blocked ids and for names starting with any excluded prefix."""
+        allowed = np.ones(self.matrix.shape[0], dtype=bool)
+        for prefix in excluded:
+            allowed[self.prefix_ids(prefix)] = False
+        if blocked:
+            allowed[np.fromiter(blocked, dtype=np.int64, count=len(blocked))] = False
+        return allowed
+
+
+def graph_arrays(graph):
+    arrays = _arrays.get(graph)
+    if arrays is None or arrays.version != graph.version:
+        arrays = _arrays[graph] = GraphArrays(graph)
+    return arrays
+
+
+def find_nodes_up_to_depth(graph, initial_node, max_depth, blocked=frozenset(), counters=None, cancel=None, terminal=frozenset()):
+    source = graph.index.get(initial_node)
+    if source is None or source in blocked:
+        return {initial_node}
+    arrays = graph_arrays(graph)
+    matrix = arrays.matrix
+    allowed = arrays.allowed_mask(blocked, ('Comp', initial_node.split('-')[0]))
+    # Reached but never part of a frontier
+    expandable = arrays.allowed_mask(terminal)
+
+    visited = np.zeros(matrix.shape[0], dtype=bool)
+    visited[source] = True
+    frontier = visited.astype(np.int32)
+    queue_peak = 1
+
+    for depth in range(max_depth):
+        graph_module.check_cancelled(cancel)
+        reached = (matrix @ frontier) > 0
+        reached &= allowed
+        reached &= ~visited
+        count = int(np.count_nonzero(reached))
+        if not count:
+            break
+        visited |= reached
+        frontier = (reached & expandable).astype(np.int32)
+        queue_peak = max(queue_peak, count)
+
+    graph_module.add_search_counters(counters, int(np.count_nonzero(visited)), queue_peak)
+    names = graph.names
+    return {names[node] for node in np.flatnonzero(visited)}
+
+
+def visited_batches(graph, sources, max_depth, blocked=frozenset(), batch_size=BATCH_SIZE, cancel=None):
+    """Yield (sources, visited) per batch, visited being an n x len(sources) CSC boolean matrix.
+
+    Column j holds every node within max_depth of sources[j] that the search
+    may enter. Only blacklisted nodes are masked: the single-source rule that
+    skips names starting with the source designator would hide a
+    component's own pins.
+    """
+    arrays = graph_arrays(graph)
+    matrix = arrays.matrix
+    node_count = matrix.shape[0]
+    allowed = sparse.diags(arrays.allowed_mask(blocked).astype(np.int32), dtype=np.int32)
+
+    for start in range(0, len(sources), batch_size):
+        batch = np.asarray(sources[start:start + batch_size], dtype=np.int64)
+        columns = np.arange(len(batch))
+        visited = sparse.csc_matrix((np.ones(len(batch), dtype=np.int32), (batch, columns)), shape=(node_count, len(batch)))
+        # Blacklisted sources are reported but not expanded
+        frontier = allowed @ visited
+        for depth in range(max_depth):
+            graph_module.check_cancelled(cancel)
+            reached = allowed @ (matrix @ frontier)
+            reached.data[:] = 1
+            reached = reached - reached.multiply(visited)
+            reached.eliminate_zeros()
+            if not reached.nnz:
+                break
+            visited = visited + reached
+            frontier = reached
+        yield batch, visited.astype(bool).tocsc()
+
+
+def component_ids(graph, components=None):
+    if components is None:
+        return [node for node in graph.index.values() if graph.kinds[node] == netmodel.COMPONENT]
+    return [graph.index[name] for name in components if name in graph.index]
+
+
+def component_neighborhoods(graph, max_depth, blocked=frozenset(), components=None, batch_size=BATCH_SIZE, cancel=None):
+    """Yield (component, set of names within max_depth) for every component, or the ones given."""
+    names = graph.names
+    for batch, visited in visited_batches(graph, component_ids(graph, components), max_depth, blocked, batch_size, cancel):
+        indptr, indices = visited.indptr, visited.indices
+        for column, source in enumerate(batch):
+            yield names[source], {names[node] for node in indices[indptr[column]:indptr[column + 1]]}
+
+
+def component_fanout(graph, max_depth, blocked=frozenset(), components=None, batch_size=BATCH_SIZE, cancel=None):
+    """Return {component: (pins, nets, components)} counts reached within max_depth, itself excluded."""
+    arrays = graph_arrays(graph)
+    # One row per node kind, so a product counts each kind per column
+    kind_rows = sparse.csr_matrix((np.ones(len(arrays.kinds), dtype=np.int32),
+                                   (arrays.kinds.astype(np.int64), np.arange(len(arrays.kinds)))),
+                                  shape=(3, len(arrays.kinds)))
+    fanout = {}
+    names = graph.names
+    for batch, visited in visited_batches(graph, component_ids(graph, components), max_depth, blocked, batch_size, cancel):
+        counts = (kind_rows @ visited.astype(np.int32)).toarray()
+        for column, source in enumerate(batch):
+            fanout[names[source]] = (int(counts[netmodel.PIN, column]), int(counts[netmodel.NET, column]),
+                                     int(counts[netmodel.COMPONENT, column]) - 1)
+    return fanout
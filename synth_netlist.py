@@ -0,0 +1,141 @@
+'''
+Synthetic netlist generator for benchmarks.
+
+Writes Protel2, KiCad legacy or KiCad S-expression netlists of roughly the requested pin count.
+Boards are mostly two-pin passives around a few large ICs and connectors,
+with a heavy GND net and several power rails, like real designs.
+'''
+import argparse
+import random
+import uuid
+
+# (designator prefix, pin count range, footprint, value, description, share of components)
+PART_TYPES = [
+    ('R', (2, 2), 'Resistor_SMD:R_0402_1005Metric', '10k', 'Resistor', 0.40),
+    ('C', (2, 2), 'Capacitor_SMD:C_0402_1005Metric', '100nF', 'Capacitor', 0.40),
+    ('D', (2, 2), 'LED_SMD:LED_0603_1608Metric', 'LED', 'Diode', 0.05),
+    ('Q', (3, 3), 'Package_TO_SOT_SMD:SOT-23', 'MMBT3904', 'Transistor', 0.05),
+    ('U', (8, 100), 'Package_QFP:LQFP-64_10x10mm_P0.5mm', 'MCU', 'Integrated circuit', 0.07),
+    ('J', (4, 40), 'Connector_PinHeader_2.54mm:PinHeader_2x20', 'Conn', 'Connector', 0.03),
+]
+
+# Rail name and the share of all pins tied to it
+RAILS = [('GND', 0.25), ('+3V3', 0.08), ('+5V', 0.03), ('+1V8', 0.02), ('VBUS', 0.01)]
+
+
+def generate(pin_count, seed=0):
+    """Return (components, nets) where components is a list of
+    (designator, footprint, value, description, pin numbers) and nets maps a
+    net name to a list of (designator, pin) pairs."""
+    rng = random.Random(seed)
+    weights = [part[5] for part in PART_TYPES]
+    counters = {}
+    components = []
+    pins = []
+    while len(pins) < pin_count:
+        prefix, (low, high), footprint, value, description, _ = rng.choices(PART_TYPES, weights)[0]
+        counters[prefix] = counters.get(prefix, 0) + 1
+        designator = f"{prefix}{counters[prefix]}"
+        numbers = [str(n) for n in range(1, rng.randint(low, high) + 1)]
+        components.append((designator, footprint, value, description, numbers))
+        pins.extend((designator, number) for number in numbers)
+
+    rng.shuffle(pins)
+    nets = {}
+    start = 0
+    for rail, share in RAILS:
+        end = start + int(len(pins) * share)
+        nets[rail] = pins[start:end]
+        start = end
+
+    # Remaining pins go to small signal nets
+    net_number = 0
+    while start < len(pins):
+        size = rng.choice((2, 2, 2, 3, 3, 4, 5, 6))
+        net_number += 1
+        nets[f"Net{net_number}"] = pins[start:start + size]
+        start += size
+    return components, nets
+
+
+def write_kicad(file, components, nets, seed=0):
+    rng = random.Random(seed)
+    net_of = {}
+    for net, members in nets.items():
+        for member in members:
+            net_of[member] = net
+
+    file.write("( { EESchema Netlist Version 1.1 created  2024-01-01T00:00:00+0000 }\n")
+    for designator, footprint, value, _, numbers in components:
+        file.write(f" ( /{uuid.UUID(int=rng.getrandbits(128))} {footprint}  {designator} {value}\n")
+        for number in numbers:
+            net = net_of.get((designator, number), f"unconnected-({designator}-Pad{number})")
+            file.write(f"  ( {number:>4} {net} )\n")
+        file.write(" )\n")
+    file.write(")\n*\n")
+
+
+def write_kicad_sexpr(file, components, nets, seed=0):
+    rng = random.Random(seed)
+    file.write('(export (version "E")\n'
+               '  (design\n'
+               '    (source "synthetic.kicad_sch")\n'
+               '    (date "2024-01-01T00:00:00+0000")\n'
+               '    (tool "Eeschema 7.0.0"))\n'
+               '  (components')
+    for designator, footprint, value, description, _ in components:
+        file.write(f'\n    (comp (ref "{designator}")\n'
+                   f'      (value "{value}")\n'
+                   f'      (footprint "{footprint}")\n'
+                   f'      (datasheet "~")\n'
+                   f'      (libsource (lib "Device") (part "{designator.rstrip("0123456789")}") (description "{description}"))\n'
+                   f'      (property (name "Sheetname") (value ""))\n'
+                   f'      (sheetpath (names "/") (tstamps "/"))\n'
+                   f'      (tstamps "{uuid.UUID(int=rng.getrandbits(128))}"))')
+    file.write(')\n  (nets')
+    for code, (net, members) in enumerate(nets.items(), 1):
+        file.write(f'\n    (net (code "{code}") (name "{net}")')
+        for designator, number in members:
+            file.write(f'\n      (node (ref "{designator}") (pin "{number}") (pintype "passive"))')
+        file.write(')')
+    file.write('))\n')
+
+
+def write_protel2(file, components, nets):
+    file.write("PROTEL NETLIST 2.0\n")
+    for designator, footprint, value, description, _ in components:
+        file.write(f"[\nDESIGNATOR\n{designator}\nFOOTPRINT\n{footprint}\nPARTTYPE\n{value}\n"
+                   f"DESCRIPTION\n{description}\nComment\n{value}\n]\n")
+    for net, members in nets.items():
+        file.write(f"(\n{net}\n")
+        for designator, number in members:
+            file.write(f"{designator}-{number} PART {number} PASSIVE\n")
+        file.write(")\n")
+
+
+def write_netlist(file_path, pin_count, file_format='kicad', seed=0):
+    components, nets = generate(pin_count, seed)
+    with open(file_path, 'w', encoding='latin-1') as file:
+        if file_format == 'protel2':
+            write_protel2(file, components, nets)
+        elif file_format == 'kicad_sexpr':
+            write_kicad_sexpr(file, components, nets, seed)
+        else:
+            write_kicad(file, components, nets, seed)
+    return components, nets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic netlist")
+    parser.add_argument("file_path", type=str, help="Output file")
+    parser.add_argument("--pins", type=int, default=10000, help="Approximate number of pins")
+    parser.add_argument("--format", choices=('kicad', 'kicad_sexpr', 'protel2'), default='kicad', help="Netlist format")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    components, nets = write_netlist(args.file_path, args.pins, args.format, args.seed)
+    print(f"{args.file_path}: {len(components)} components, {len(nets)} nets")
+
+
+if __name__ == "__main__":
+    main()
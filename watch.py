@@ -0,0 +1,127 @@
+'''
+Watch mode: follow a netlist that is re-exported while you work.
+
+    python watch.py netlist.NET U1-5 --target J2 --depth 2
+
+FileWatcher polls the file's size and mtime, which is cheap, and only hashes
+it once the stamp has changed and then stayed the same for one poll, so a
+file still being written is not read. A touch that leaves the content alone
+is ignored. reload_netlist re-parses the file and diffs it against the
+loaded revision; the diff then patches the existing graph (apply_diff)
+instead of rebuilding it. The page is written with live_reload, so an open
+tab reloads itself when it is rewritten.
+'''
+import argparse
+import os
+import time
+
+import graph
+import loader
+import lod
+import netdiff
+
+# Seconds between two looks at the file
+POLL_SECONDS = 1.0
+
+
+def file_stamp(file_path):
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        # Missing for a moment while the tool replaces it
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class FileWatcher:
+    """Tells when the content of one file has changed since the last accepted digest."""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.stamp = file_stamp(file_path)
+        self.pending = None
+        self.digest = loader.file_digest(file_path)
+
+    def settled_change(self):
+        """True once the stamp differs from the accepted one and held still since the last call."""
+        stamp = file_stamp(self.file_path)
+        if stamp is None or stamp == self.stamp:
+            self.pending = None
+            return False
+        if stamp != self.pending:
+            self.pending = stamp
+            return False
+        self.pending = None
+        self.stamp = stamp
+        return True
+
+    def new_digest(self):
+        """Hash the file; return the digest if the content changed, else None.
+
+        The digest is only accepted by setting ``digest`` once the reload worked.
+        """
+        digest = loader.file_digest(self.file_path)
+        return digest if digest != self.digest else None
+
+
+def reload_netlist(file_path, digest, nets, components, cancel=None):
+    """Parse file_path again and diff it against the loaded nets and components.
+
+    Returns (nets, components, descriptions, diff) of the new revision. The
+    graph is left alone: apply the diff once the new revision is accepted.
+    """
+    new_nets, new_components, descriptions = loader.load_file(file_path, digest=digest)
+    graph.check_cancelled(cancel)
+    diff = netdiff.diff_netlists(nets, components, new_nets, new_components)
+    return new_nets, new_components, descriptions, diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Redraw graph.html whenever the netlist changes")
+    parser.add_argument("file_path", type=str, help="Netlist to watch")
+    parser.add_argument("initial_node", type=str, help="Source pin or component")
+    parser.add_argument("--target", type=str, default=None, help="Target pin or component")
+    parser.add_argument("--depth", type=int, default=0, help="Maximum depth")
+    parser.add_argument("--paths", type=int, default=1, help="Number of paths")
+    parser.add_argument("--renderer", choices=('pyvis', 'light'), default='light', help="Page writer")
+    parser.add_argument("--node-budget", type=int, default=lod.NODE_BUDGET, help="Nodes drawn at first by the light renderer, 0 for all")
+    parser.add_argument("--output", type=str, default="graph.html", help="Page to keep up to date")
+    parser.add_argument("--interval", type=float, default=POLL_SECONDS, help="Seconds between checks")
+    parser.add_argument("--no-browser", action="store_true", help="Do not open the page")
+    args = parser.parse_args()
+
+    watcher = FileWatcher(args.file_path)
+    nets, components, descriptions, netlist_graph = loader.load_file(args.file_path, digest=watcher.digest, with_graph=True)
+
+    def draw(open_browser):
+        graph.graphs(descriptions, nets, components, args.initial_node, args.target, args.depth, num_path=args.paths,
+                     graph=netlist_graph, renderer=args.renderer, output_path=args.output, open_browser=open_browser,
+                     live_reload=True, node_budget=args.node_budget or None)
+
+    draw(not args.no_browser)
+    print(f"Watching {args.file_path}, Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(args.interval)
+            if not watcher.settled_change():
+                continue
+            digest = watcher.new_digest()
+            if digest is None:
+                continue
+            try:
+                nets, components, descriptions, diff = reload_netlist(args.file_path, digest, nets, components)
+            except (OSError, ValueError) as error:
+                print(f"Reload failed, keeping the previous revision: {error}")
+                continue
+            watcher.digest = digest
+            if diff:
+                netlist_graph.apply_diff(diff)
+            for line in diff.summary_lines():
+                print(line)
+            draw(False)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()